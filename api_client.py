@@ -0,0 +1,153 @@
+from collections import namedtuple
+from functools import partial
+from http import HTTPStatus
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from exceptions import IncorrectAPIRequest, IncorrectStatusRequest
+from hedging import POLL_DEADLINE, HedgedCaller
+from homework import (ENDPOINT, REQUEST_TIMEOUT, logger, make_headers,
+                      request_api)
+from metrics import bind_stats, breaker_state, breaker_stats, limiter_stats
+from ratelimit import RateLimiter
+from retries import Retrier
+from stream_parser import STREAM_CHUNK, StreamingAnswer
+
+
+POOL_CONNECTIONS = 1
+POOL_MAXSIZE = 32
+
+ConnectionStats = namedtuple(
+    'ConnectionStats', ('requests', 'handshakes', 'reused'))
+
+
+class PracticumClient:
+    """Клиент API Практикума с пулом keep-alive соединений.
+
+    Один экземпляр переиспользуется между опросами и между студентами:
+    TCP- и TLS-соединения к эндпоинту остаются открытыми в пуле адаптера,
+    а заголовки авторизации кешируются по токену.
+    """
+
+    def __init__(self, endpoint=ENDPOINT, pool_connections=POOL_CONNECTIONS,
+                 pool_maxsize=POOL_MAXSIZE, limiter=None, breaker=None,
+                 retrier=None, hedger=None, timeout=REQUEST_TIMEOUT):
+        """Создает сессию и монтирует адаптер с пулом соединений."""
+        self.endpoint = endpoint
+        self.limiter = limiter
+        self.breaker = breaker
+        self.retrier = retrier
+        self.hedger = hedger
+        self.timeout = timeout
+        self.adapter = HTTPAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize)
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self._headers = {}
+
+    def headers(self, token):
+        """Возвращает закешированные заголовки для токена."""
+        headers = self._headers.get(token)
+        if headers is None:
+            headers = self._headers[token] = make_headers(token)
+        return headers
+
+    def get_api_answer(self, token, timestamp, timeout=None):
+        """Запрашивает статусы работ студента через общую сессию."""
+        timeout = self.timeout if timeout is None else timeout
+        if self.retrier:
+            return self.retrier.call(self._guarded_request, token,
+                                     timestamp, timeout)
+        return self._guarded_request(token, timestamp, timeout)
+
+    def _guarded_request(self, token, timestamp, timeout):
+        if self.limiter:
+            self.limiter.acquire(token)
+        if self.breaker:
+            return self.breaker.call(self._hedged_request, token, timestamp,
+                                     timeout)
+        return self._hedged_request(token, timestamp, timeout)
+
+    def _hedged_request(self, token, timestamp, timeout):
+        if self.hedger:
+            may_hedge = (partial(self.limiter.try_acquire, token)
+                         if self.limiter else None)
+            return self.hedger.call(self._request, token, timestamp, timeout,
+                                    may_hedge=may_hedge)
+        return self._request(token, timestamp, timeout)
+
+    def _request(self, token, timestamp, timeout):
+        return request_api(self.session.get, self.endpoint,
+                           self.headers(token), timestamp, timeout=timeout)
+
+    def stream_homeworks(self, token, timestamp, chunk_size=STREAM_CHUNK):
+        """Открывает ответ API как поток работ без разбора всего тела."""
+        if self.breaker:
+            return self.breaker.call(self._open_stream, token, timestamp,
+                                     chunk_size)
+        return self._open_stream(token, timestamp, chunk_size)
+
+    def _open_stream(self, token, timestamp, chunk_size):
+        if self.limiter:
+            self.limiter.acquire(token)
+        try:
+            response = self.session.get(
+                self.endpoint, headers=self.headers(token),
+                params={'from_date': timestamp}, timeout=self.timeout,
+                stream=True)
+        except requests.RequestException as error:
+            raise IncorrectAPIRequest(
+                f'Ошибка при выполнении запроса: {error}') from error
+        if response.status_code != HTTPStatus.OK:
+            response.close()
+            raise IncorrectStatusRequest('Статус запроса не 200',
+                                         response.status_code)
+        return StreamingAnswer(response.iter_content(chunk_size),
+                               close=response.close)
+
+    def stats(self):
+        """Возвращает число запросов, рукопожатий и переиспользований."""
+        pools = self.adapter.poolmanager.pools
+        total_requests = handshakes = 0
+        for key in pools.keys():
+            pool = pools[key]
+            total_requests += pool.num_requests
+            handshakes += pool.num_connections
+        return ConnectionStats(total_requests, handshakes,
+                               total_requests - handshakes)
+
+    def close(self):
+        """Закрывает все соединения пула."""
+        if self.hedger:
+            self.hedger.shutdown()
+        self.session.close()
+
+    def __enter__(self):
+        """Возвращает клиент для использования в блоке with."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Закрывает клиент при выходе из блока with."""
+        self.close()
+
+
+def expose_metrics(client):
+    """Показывает в метриках ограничитель и предохранитель клиента."""
+    bind_stats(limiter_stats, client.limiter.stats)
+    bind_stats(breaker_stats, client.breaker.stats)
+    for state in (CLOSED, HALF_OPEN, OPEN):
+        breaker_state.labels(state).set_function(
+            lambda state=state: int(client.breaker.state == state))
+    return client
+
+
+def build_client(pool_maxsize=POOL_MAXSIZE):
+    """Создает клиент с ограничителем, предохранителем, повторами и дублями."""
+    return expose_metrics(PracticumClient(
+        pool_maxsize=pool_maxsize, limiter=RateLimiter(),
+        breaker=CircuitBreaker(),
+        retrier=Retrier(logger=logger, deadline=POLL_DEADLINE),
+        hedger=HedgedCaller()))
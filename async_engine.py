@@ -0,0 +1,253 @@
+import asyncio
+from functools import partial
+from http import HTTPStatus
+import json
+import math
+import time
+
+import aiohttp
+from telebot import asyncio_helper
+from telebot.async_telebot import AsyncTeleBot
+
+from api_client import expose_metrics
+from breaker import CircuitBreaker
+from exceptions import (IncorrectAPIRequest, IncorrectStatusRequest,
+                        RetryAfter)
+from hedging import POLL_DEADLINE, HedgedCaller
+from homework import (CONNECT_TIMEOUT, ENDPOINT, READ_TIMEOUT, TELEGRAM_TOKEN,
+                      logger, make_headers)
+from metrics import count_error, request_seconds, send_seconds
+from ratelimit import RateLimiter
+from retries import Retrier
+from scheduler import AdaptivePolicy, DeadlineScheduler
+from telegram_sender import TelegramSender
+from tenants import process_answer, process_error
+
+
+CONCURRENCY = 100
+
+
+class AsyncPracticumClient:
+    """Неблокирующий клиент API Практикума поверх aiohttp."""
+
+    def __init__(self, session, endpoint=ENDPOINT, limiter=None,
+                 breaker=None, retrier=None, hedger=None):
+        """Запоминает сессию aiohttp, ограничивающую число соединений."""
+        self.session = session
+        self.endpoint = endpoint
+        self.limiter = limiter
+        self.breaker = breaker
+        self.retrier = retrier
+        self.hedger = hedger
+        self._headers = {}
+
+    def headers(self, token):
+        """Возвращает закешированные заголовки для токена."""
+        headers = self._headers.get(token)
+        if headers is None:
+            headers = self._headers[token] = make_headers(token)
+        return headers
+
+    async def get_api_answer(self, token, timestamp):
+        """Запрашивает статусы работ студента без блокировки цикла."""
+        if self.retrier:
+            return await self.retrier.call_async(self._guarded_request,
+                                                 token, timestamp)
+        return await self._guarded_request(token, timestamp)
+
+    async def _guarded_request(self, token, timestamp):
+        if self.limiter:
+            await self.limiter.acquire_async(token)
+        if self.breaker:
+            return await self.breaker.call_async(self._hedged_request, token,
+                                                 timestamp)
+        return await self._hedged_request(token, timestamp)
+
+    async def _hedged_request(self, token, timestamp):
+        if self.hedger:
+            may_hedge = (partial(self.limiter.try_acquire, token)
+                         if self.limiter else None)
+            return await self.hedger.call_async(self._request, token,
+                                                timestamp, may_hedge=may_hedge)
+        return await self._request(token, timestamp)
+
+    async def _request(self, token, timestamp):
+        payload = {'from_date': timestamp}
+        started = time.perf_counter()
+        try:
+            async with self.session.get(self.endpoint,
+                                        headers=self.headers(token),
+                                        params=payload) as response:
+                if response.status != HTTPStatus.OK:
+                    raise IncorrectStatusRequest('Статус запроса не 200',
+                                                 response.status)
+                return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            raise IncorrectAPIRequest(
+                f'Ошибка при выполнении запроса: {error}') from error
+        except json.JSONDecodeError as error:
+            raise ValueError(f'Данные не являются'
+                             f'допустимым документом JSON {error}')
+        finally:
+            request_seconds.observe(time.perf_counter() - started)
+
+
+async def send_to_chat(bot, chat_id, message):
+    """Отправляет сообщение в Telegram-чат без блокировки цикла."""
+    started = time.perf_counter()
+    try:
+        await bot.send_message(chat_id, message)
+    except asyncio_helper.ApiException as error:
+        count_error(error)
+        logger.error(f'Ошибка отправки сообщения: {error}')
+        return False
+    finally:
+        send_seconds.observe(time.perf_counter() - started)
+    logger.debug('Отправлено сообщение')
+    return True
+
+
+async def poll_tenant(client, tenant, store=None):
+    """Опрашивает API для студента и возвращает новые сообщения."""
+    try:
+        api_answer = await client.get_api_answer(tenant.token,
+                                                 tenant.timestamp)
+        return process_answer(tenant, api_answer, store)
+    except Exception as error:
+        return process_error(tenant, error, store)
+
+
+async def serve_tenant(client, bot, tenant, policy, store=None):
+    """Опрашивает API для студента и отправляет ему новые сообщения.
+
+    С хранилищем сообщения только пишутся в outbox: их отправит
+    send_outbox после фиксации.
+    """
+    messages = await poll_tenant(client, tenant, store)
+    policy.decide(tenant)
+    if store:
+        for message in messages:
+            store.enqueue(tenant.chat_id, message)
+        store.maybe_flush()
+        return
+    for message in messages:
+        await send_to_chat(bot, tenant.chat_id, message)
+
+
+class AsyncTelegramSender(TelegramSender):
+    """TelegramSender для AsyncTeleBot: лимиты выдерживаются без блокировки.
+
+    По умолчанию занятый чат не откладывается через RetryAfter:
+    корутина просто ждет своей очереди в ограничителе.
+    """
+
+    def __init__(self, bot, limiter=None, defer_after=math.inf,
+                 logger=None):
+        """Запоминает асинхронного бота и ограничитель."""
+        super().__init__(bot, limiter, defer_after, logger)
+
+    async def __call__(self, chat_id, text):
+        """Отправляет сообщение; возвращает False при неустранимой ошибке."""
+        wait = self.limiter.wait_time(chat_id)
+        if wait > self.defer_after:
+            raise RetryAfter(wait)
+        await self.limiter.acquire_async(chat_id)
+        started = time.perf_counter()
+        try:
+            await self.bot.send_message(chat_id, text)
+        except asyncio_helper.ApiException as error:
+            return self.failed(chat_id, error)
+        finally:
+            send_seconds.observe(time.perf_counter() - started)
+        return self.sent()
+
+
+async def send_entry(send, store, entry):
+    """Отправляет уведомление из outbox через send и подтверждает его.
+
+    При RetryAfter (429, ошибка сервера Telegram) отправка повторяется
+    через retry_after. Уведомление подтверждается после ответа Telegram,
+    в том числе окончательного отказа; при сбое сети оно возвращается
+    в outbox до следующего опроса.
+    """
+    while True:
+        try:
+            await send(entry.chat_id, entry.text)
+        except RetryAfter as error:
+            await asyncio.sleep(error.retry_after)
+            continue
+        except Exception as error:
+            count_error(error)
+            logger.error(f'Ошибка отправки сообщения: {error}')
+            store.return_entry(entry)
+        else:
+            store.acknowledge(entry.id)
+        return
+
+
+async def send_outbox(send, store):
+    """Отправляет зафиксированные уведомления из outbox.
+
+    Корутины запускаются разом, а темп задает ограничитель send:
+    общий лимит Telegram и лимит на чат.
+    """
+    await asyncio.gather(*(send_entry(send, store, entry)
+                           for entry in store.take_outbox()))
+
+
+async def consume_outbox(send, store, entries):
+    """Отправляет уведомления из asyncio.Queue entries, пока задачу не отменят.
+
+    Каждое уведомление отправляется своей задачей, так что чат, который
+    ждет лимита или retry_after, не задерживает остальные чаты и опрос:
+    цикл опроса только кладет уведомления в очередь.
+    """
+    sending = set()
+    while True:
+        entry = await entries.get()
+        task = asyncio.create_task(send_entry(send, store, entry))
+        sending.add(task)
+        task.add_done_callback(sending.discard)
+
+
+async def poll_once(client, bot, tenants, policy=None, store=None):
+    """Параллельно обслуживает переданных студентов."""
+    policy = policy or AdaptivePolicy()
+    await asyncio.gather(*(serve_tenant(client, bot, tenant, policy, store)
+                           for tenant in tenants))
+
+
+async def run(registry, bot, store, endpoint=ENDPOINT,
+              concurrency=CONCURRENCY):
+    """Обслуживает студентов по сроку, ограничивая число запросов."""
+    policy = AdaptivePolicy()
+    policy.stagger(registry)
+    scheduler = DeadlineScheduler(registry)
+    send = AsyncTelegramSender(bot, logger=logger)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(sock_connect=CONNECT_TIMEOUT,
+                                    sock_read=READ_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector,
+                                     timeout=timeout) as session:
+        client = expose_metrics(AsyncPracticumClient(
+            session, endpoint, RateLimiter(), CircuitBreaker(),
+            Retrier(logger=logger, deadline=POLL_DEADLINE), HedgedCaller()))
+        entries = asyncio.Queue()
+        consumer = asyncio.create_task(consume_outbox(send, store, entries))
+        try:
+            while True:
+                due = scheduler.pop_due()
+                await poll_once(client, bot, due, policy, store)
+                scheduler.push_all(due)
+                store.flush()
+                for entry in store.take_outbox():
+                    entries.put_nowait(entry)
+                await asyncio.sleep(scheduler.seconds_until_next())
+        finally:
+            consumer.cancel()
+
+
+def run_asyncio(registry, store):
+    """Запускает асинхронный опрос реестра."""
+    bot = AsyncTeleBot(token=TELEGRAM_TOKEN)
+    asyncio.run(run(registry, bot, store))
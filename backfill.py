@@ -0,0 +1,85 @@
+from collections import namedtuple
+from itertools import islice
+import logging
+
+from validator import as_records, validate_answer
+
+
+logger = logging.getLogger('homework')
+
+CHUNK_SIZE = 500
+
+BackfillProgress = namedtuple(
+    'BackfillProgress', ('chunks', 'homeworks', 'transitions'))
+
+
+class HomeworkStream:
+    """Работы из уже разобранного ответа API в виде потока записей.
+
+    Для больших ответов вместо него используется StreamingAnswer.
+    """
+
+    def __init__(self, api_answer):
+        """Проверяет ответ API и запоминает его current_date."""
+        answer = validate_answer(api_answer)
+        self._homeworks = answer.homeworks
+        self.errors = answer.errors
+        self.current_date = answer.current_date
+
+    def __iter__(self):
+        """Перебирает работы ответа."""
+        return iter(self._homeworks)
+
+
+def chunked(iterable, size):
+    """Выдает элементы последовательности списками не длиннее size."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def log_errors(tenant, errors):
+    """Логирует и забывает накопленные ошибки разбора истории."""
+    for error in errors:
+        logger.error(f'Ошибка разбора истории {tenant!r}: '
+                     f'{error.path}: {error.message}')
+    errors.clear()
+
+
+def backfill(stream, store, tenant, announce_new=False,
+             chunk_size=CHUNK_SIZE, on_progress=None):
+    """Загружает историю работ в хранилище порциями.
+
+    Выдает сообщения только о настоящих сменах статуса: ранее известная
+    работа получила другой статус. О работах, которых хранилище еще не
+    видело, сообщается лишь при announce_new — при восстановлении после
+    простоя, но не при первом подключении студента. Работы переводятся
+    в записи HomeworkRecord по мере чтения, словари ответа не копятся.
+
+    Статусы порции фиксируются только после того, как вызывающий код
+    получил ее сообщения и записал их в outbox.
+    """
+    progress = BackfillProgress(0, 0, 0)
+    errors = list(getattr(stream, 'errors', ()))
+    for chunk in chunked(as_records(stream, errors), chunk_size):
+        log_errors(tenant, errors)
+        messages = [event.homework.message for event
+                    in store.transitions(tenant.token, chunk)
+                    if event.previous is not None or announce_new]
+        yield from messages
+        store.flush()
+        progress = BackfillProgress(progress.chunks + 1,
+                                    progress.homeworks + len(chunk),
+                                    progress.transitions + len(messages))
+        logger.info(f'Загрузка истории {tenant!r}: порций {progress.chunks}, '
+                    f'работ {progress.homeworks}, '
+                    f'смен статуса {progress.transitions}')
+        if on_progress:
+            on_progress(progress)
+    log_errors(tenant, errors)
+    tenant.timestamp = stream.current_date
+    store.save_tenant(tenant)
+    store.flush()
@@ -0,0 +1,70 @@
+import argparse
+import io
+import logging
+import time
+
+from log_format import JsonFormatter, RepeatSampler
+
+
+TENANTS = 1000
+POLLS = 60
+POLL_INTERVAL = 10
+
+
+class FakeClock:
+    """Часы, которые двигает сам замер."""
+
+    def __init__(self):
+        """Начинает отсчет с нуля."""
+        self.now = 0
+
+    def __call__(self):
+        """Возвращает текущее время замера."""
+        return self.now
+
+
+def run(formatter, sample, tenants, polls, clock):
+    """Пишет пустые опросы студентов и возвращает байты и секунды."""
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(formatter)
+    sampler = None
+    if sample:
+        sampler = RepeatSampler(handler, clock=clock)
+        handler.addFilter(sampler)
+    started = time.perf_counter()
+    for poll in range(polls):
+        clock.now = poll * POLL_INTERVAL
+        if sampler and clock.now % sampler.window == 0:
+            sampler.flush()
+        for tenant in range(tenants):
+            handler.handle(logging.makeLogRecord({
+                'name': 'homework', 'levelno': logging.DEBUG,
+                'levelname': 'DEBUG', 'msg': 'Новые статусы отсутствуют.',
+                'tenant': tenant, 'phase': 'idle', 'duration': 0.05}))
+    if sampler:
+        sampler.flush()
+    elapsed = time.perf_counter() - started
+    return len(stream.getvalue().encode()), elapsed
+
+
+def main():
+    """Сравнивает объем лога пустых опросов в тексте и в JSON со сводками."""
+    parser = argparse.ArgumentParser(
+        description='Замер объема лога пустых опросов.')
+    parser.add_argument('--tenants', type=int, default=TENANTS)
+    parser.add_argument('--polls', type=int, default=POLLS)
+    args = parser.parse_args()
+    clock = FakeClock()
+    for name, formatter, sample in (
+            ('текст', logging.Formatter(
+                '%(asctime)s, %(levelname)s, %(message)s, %(name)s'), False),
+            ('JSON', JsonFormatter(), False),
+            ('JSON со сводками', JsonFormatter(), True)):
+        size, elapsed = run(formatter, sample, args.tenants, args.polls,
+                            clock)
+        print(f'{name}: {size} байт, {elapsed:.2f} с')
+
+
+if __name__ == '__main__':
+    main()
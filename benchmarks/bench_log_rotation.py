@@ -0,0 +1,64 @@
+import argparse
+import logging
+from logging.handlers import RotatingFileHandler
+import os
+import tempfile
+import time
+
+from log_rotation import CompressingRotatingFileHandler
+
+
+RECORDS = 200_000
+MAX_BYTES = 1024 * 1024
+TENANTS = 1000
+
+
+def footprint(directory):
+    """Возвращает суммарный размер файлов в каталоге."""
+    return sum(entry.stat().st_size for entry in os.scandir(directory))
+
+
+def run(handler, records):
+    """Пишет записи опроса и возвращает время записи в секундах."""
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)s, %(levelname)s, %(message)s, %(name)s'))
+    started = time.perf_counter()
+    for number in range(records):
+        handler.emit(logging.makeLogRecord({
+            'name': 'homework', 'levelno': logging.DEBUG,
+            'levelname': 'DEBUG',
+            'msg': f'Студент {number % TENANTS}: '
+                   f'Новые статусы отсутствуют.'}))
+    return time.perf_counter() - started
+
+
+def main():
+    """Сравнивает место на диске с обычной ротацией и со сжатием."""
+    parser = argparse.ArgumentParser(
+        description='Замер места на диске, занятого ротированным логом.')
+    parser.add_argument('--records', type=int, default=RECORDS)
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as plain, \
+            tempfile.TemporaryDirectory() as compressed:
+        handler = RotatingFileHandler(os.path.join(plain, 'bot.log'),
+                                      maxBytes=args.max_bytes,
+                                      backupCount=1000)
+        elapsed = run(handler, args.records)
+        handler.close()
+        print(f'RotatingFileHandler: {footprint(plain)} байт, '
+              f'{elapsed:.2f} с')
+        handler = CompressingRotatingFileHandler(
+            os.path.join(compressed, 'bot.log'), max_bytes=args.max_bytes)
+        elapsed = run(handler, args.records)
+        handler.compressor.join()
+        handler.close()
+        stats = handler.compressor.stats()
+        print(f'CompressingRotatingFileHandler: '
+              f'{footprint(compressed)} байт, {elapsed:.2f} с, '
+              f'сжато сегментов {stats.segments}, '
+              f'сэкономлено {stats.bytes_saved} байт')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import argparse
+import time
+
+from metrics import Counter, Histogram, MetricsRegistry, timed
+
+
+OBSERVATIONS = 1_000_000
+
+
+def per_call(function, count):
+    """Возвращает среднее время одного вызова в наносекундах."""
+    started = time.perf_counter()
+    for _ in range(count):
+        function()
+    return (time.perf_counter() - started) / count * 1e9
+
+
+def main():
+    """Замеряет стоимость наблюдения метрик на горячем пути."""
+    parser = argparse.ArgumentParser(
+        description='Замер накладных расходов метрик.')
+    parser.add_argument('--count', type=int, default=OBSERVATIONS)
+    args = parser.parse_args()
+    counter = Counter()
+    histogram = Histogram()
+    errors = MetricsRegistry().counter('errors_total', 'Ошибки.',
+                                       labels=('exception',))
+    baseline = per_call(lambda: None, args.count)
+    for name, function in (
+            ('Counter.inc', counter.inc),
+            ('Counter по метке', lambda: errors.labels('KeyError').inc()),
+            ('Histogram.observe', lambda: histogram.observe(0.042)),
+            ('timed', lambda: timed(histogram, int))):
+        cost = per_call(function, args.count) - baseline
+        print(f'{name}: {cost:.0f} нс')
+
+
+if __name__ == '__main__':
+    main()
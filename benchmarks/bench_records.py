@@ -0,0 +1,56 @@
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks.bench_stream_parser import chunks, make_payload
+from stream_parser import StreamingAnswer
+from validator import as_records
+
+
+HOMEWORKS = 100_000
+
+
+def keep_dicts(payload):
+    """Прежнее представление: словари работ из json.loads."""
+    return json.loads(payload)['homeworks']
+
+
+def keep_records(payload):
+    """Новое представление: записи HomeworkRecord с общими статусами."""
+    return list(as_records(StreamingAnswer(chunks(payload)), []))
+
+
+def measure(func, payload):
+    """Возвращает время разбора и память, занятую результатом."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    homeworks = func(payload)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(homeworks), elapsed, retained
+
+
+def main():
+    """Сравнивает память, занятую словарями работ и записями."""
+    parser = argparse.ArgumentParser(
+        description='Замер памяти под работы в словарях и записях.')
+    parser.add_argument('--homeworks', type=int, default=HOMEWORKS)
+    args = parser.parse_args()
+    payload = make_payload(args.homeworks)
+    print(f'размер ответа: {len(payload) / 2 ** 20:.1f} МиБ, '
+          f'работ: {args.homeworks}')
+    for name, func in (('словари', keep_dicts), ('записи', keep_records)):
+        count, elapsed, retained = measure(func, payload)
+        assert count == args.homeworks
+        print(f'{name}: {elapsed * 1e3:.0f} мс, в памяти '
+              f'{retained / 2 ** 20:.1f} МиБ, '
+              f'{retained / count:.0f} байт на работу')
+
+
+if __name__ == '__main__':
+    main()
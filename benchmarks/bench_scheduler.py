@@ -0,0 +1,64 @@
+import argparse
+import random
+import statistics
+import time
+
+from scheduler import DeadlineScheduler
+from tenants import Tenant
+
+
+TENANTS = 100_000
+SPREAD = 2.0
+
+
+def percentile(values, share):
+    """Возвращает перцентиль отсортированного списка."""
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def bench(tenants_count, spread):
+    """Измеряет стоимость планирования и задержку выдачи студентов."""
+    rng = random.Random(0)
+    tenants = [Tenant(str(number), number, timestamp=0)
+               for number in range(tenants_count)]
+    start = time.time() + 0.5
+    for tenant in tenants:
+        tenant.next_poll = start + rng.uniform(0, spread)
+
+    started = time.perf_counter()
+    scheduler = DeadlineScheduler(tenants)
+    push_cost = (time.perf_counter() - started) / tenants_count
+
+    lags = []
+    pop_time = 0
+    while len(lags) < tenants_count:
+        scheduler.sleep_until_next()
+        started = time.perf_counter()
+        now = time.time()
+        due = scheduler.pop_due(now)
+        pop_time += time.perf_counter() - started
+        for tenant in due:
+            lags.append(now - tenant.next_poll)
+            tenant.next_poll = float('inf')
+    lags.sort()
+    print(f'студентов: {tenants_count}, разброс сроков: {spread} с')
+    print(f'постановка в очередь: {push_cost * 1e6:.2f} мкс на студента')
+    print(f'выдача созревших: {pop_time / tenants_count * 1e6:.2f} '
+          'мкс на студента')
+    print(f'задержка выдачи: среднее {statistics.mean(lags) * 1e3:.3f} мс, '
+          f'p99 {percentile(lags, 0.99) * 1e3:.3f} мс, '
+          f'максимум {lags[-1] * 1e3:.3f} мс')
+
+
+def main():
+    """Запускает замер планировщика на симулированных студентах."""
+    parser = argparse.ArgumentParser(
+        description='Замер планировщика опросов.')
+    parser.add_argument('--tenants', type=int, default=TENANTS)
+    parser.add_argument('--spread', type=float, default=SPREAD)
+    args = parser.parse_args()
+    bench(args.tenants, args.spread)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import time
+
+from outbound import OutboundQueue
+from telegram_sender import TelegramSender, telegram_limiter
+
+
+CHATS = 60
+PER_CHAT = 3
+WORKERS = 4
+SEND_LATENCY = 0.02
+
+
+class SlowBot:
+    """Бот с задержкой ответа Telegram."""
+
+    def __init__(self, latency):
+        """Запоминает задержку отправки."""
+        self.latency = latency
+        self.sent = 0
+
+    def send_message(self, chat_id, text):
+        """Имитирует отправку сообщения."""
+        time.sleep(self.latency)
+        self.sent += 1
+
+
+class BlockingSender:
+    """Прежний подход: поток отправки ждет свой чат на месте."""
+
+    def __init__(self, bot, limiter):
+        """Запоминает бота и ограничитель."""
+        self.bot = bot
+        self.limiter = limiter
+
+    def __call__(self, chat_id, text):
+        """Ждет лимита чата и отправляет сообщение."""
+        self.limiter.acquire(chat_id)
+        self.bot.send_message(chat_id, text)
+
+
+def run(make_sender, chats, per_chat, workers, latency):
+    """Отправляет всплеск сообщений и возвращает сообщений в секунду.
+
+    Как после backfill, сообщения одного чата идут в очереди подряд.
+    """
+    bot = SlowBot(latency)
+    started = time.monotonic()
+    with OutboundQueue(make_sender(bot, telegram_limiter()), maxsize=0,
+                       workers=workers) as outbound:
+        for chat in range(chats):
+            for number in range(per_chat):
+                outbound.put(chat, f'{number}')
+    elapsed = time.monotonic() - started
+    assert bot.sent == chats * per_chat
+    return bot.sent / elapsed
+
+
+def main():
+    """Сравнивает пропускную способность при всплеске после backfill."""
+    parser = argparse.ArgumentParser(
+        description='Замер отправки всплеска сообщений в Telegram.')
+    parser.add_argument('--chats', type=int, default=CHATS)
+    parser.add_argument('--per-chat', type=int, default=PER_CHAT)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    args = parser.parse_args()
+    for name, make_sender in (
+            ('ожидание в потоке', BlockingSender),
+            ('откладывание чата', lambda bot, limiter: TelegramSender(
+                bot, limiter=limiter))):
+        rate = run(make_sender, args.chats, args.per_chat, args.workers,
+                   SEND_LATENCY)
+        print(f'{name}: {rate:.1f} сообщений/с')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import json
+import time
+import tracemalloc
+
+from stream_parser import STREAM_CHUNK, StreamingAnswer
+
+
+HOMEWORKS = 20_000
+
+
+def make_payload(count):
+    """Собирает ответ API с заданным числом работ."""
+    homeworks = [{
+        'id': number,
+        'status': 'approved',
+        'homework_name': f'student__hw{number}.zip',
+        'reviewer_comment': 'Отличная работа, замечаний нет. ' * 5,
+        'date_updated': '2021-04-11T10:31:09Z',
+        'lesson_name': 'Проект спринта: Деплой бота',
+    } for number in range(count)]
+    return json.dumps({'homeworks': homeworks,
+                       'current_date': 1618137069}).encode()
+
+
+def chunks(payload, size=STREAM_CHUNK):
+    """Отдает тело ответа порциями, как response.iter_content."""
+    for start in range(0, len(payload), size):
+        yield payload[start:start + size]
+
+
+def decode_whole(payload):
+    """Текущий путь: собрать тело целиком и вызвать json."""
+    body = b''.join(chunks(payload))
+    answer = json.loads(body)
+    return sum(1 for _ in answer['homeworks'])
+
+
+def decode_streaming(payload):
+    """Потоковый путь: работы по одной из порций тела."""
+    return sum(1 for _ in StreamingAnswer(chunks(payload)))
+
+
+def measure(func, payload):
+    """Возвращает время и пиковую память вызова."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = func(payload)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    """Сравнивает разбор ответа целиком и потоковый разбор."""
+    parser = argparse.ArgumentParser(
+        description='Замер потокового разбора ответа API.')
+    parser.add_argument('--homeworks', type=int, default=HOMEWORKS)
+    args = parser.parse_args()
+    payload = make_payload(args.homeworks)
+    print(f'размер ответа: {len(payload) / 2 ** 20:.1f} МиБ, '
+          f'работ: {args.homeworks}')
+    for name, func in (('json целиком', decode_whole),
+                       ('потоковый', decode_streaming)):
+        count, elapsed, peak = measure(func, payload)
+        assert count == args.homeworks
+        print(f'{name}: {elapsed * 1e3:.0f} мс, '
+              f'пик памяти {peak / 2 ** 20:.2f} МиБ')
+
+
+if __name__ == '__main__':
+    main()
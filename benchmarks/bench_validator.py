@@ -0,0 +1,59 @@
+import argparse
+import timeit
+
+from homework import check_response, parse_status
+from validator import validate_answer
+
+
+HOMEWORKS = 20
+REPEAT = 2000
+
+
+def make_answer(count, broken=0):
+    """Собирает ответ API, в котором broken работ с неизвестным статусом."""
+    homeworks = [{
+        'id': number,
+        'status': 'unknown' if number < broken else 'approved',
+        'homework_name': f'student__hw{number}.zip',
+        'date_updated': '2021-04-11T10:31:09Z',
+        'lesson_name': 'Проект спринта: Деплой бота',
+    } for number in range(count)]
+    return {'homeworks': homeworks, 'current_date': 1618137069}
+
+
+def with_check_response(answer):
+    """Прежний путь: check_response и parse_status для каждой работы."""
+    messages = []
+    for homework in check_response(answer):
+        try:
+            messages.append(parse_status(homework))
+        except (KeyError, ValueError):
+            pass
+    return messages
+
+
+def with_validator(answer):
+    """Проверка всех полей с записями и ошибками по каждой работе."""
+    return [record.message for record in validate_answer(answer).homeworks]
+
+
+def main():
+    """Замеряет цену полной проверки ответа против check_response."""
+    parser = argparse.ArgumentParser(
+        description='Замер проверки ответа API.')
+    parser.add_argument('--homeworks', type=int, default=HOMEWORKS)
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    args = parser.parse_args()
+    for title, broken in (('без ошибок', 0),
+                          ('половина с ошибками', args.homeworks // 2)):
+        answer = make_answer(args.homeworks, broken)
+        for name, func in (('check_response', with_check_response),
+                           ('валидатор', with_validator)):
+            elapsed = min(timeit.repeat(lambda: func(answer),
+                                        number=args.repeat, repeat=5))
+            print(f'{title}, {name}: '
+                  f'{elapsed / args.repeat * 1e6:.1f} мкс на ответ')
+
+
+if __name__ == '__main__':
+    main()
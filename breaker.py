@@ -0,0 +1,128 @@
+from collections import namedtuple
+from http import HTTPStatus
+import logging
+import threading
+import time
+
+from exceptions import (CircuitBreakerOpen, IncorrectAPIRequest,
+                        IncorrectStatusRequest)
+
+
+logger = logging.getLogger('homework')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 60
+
+BreakerStats = namedtuple(
+    'BreakerStats', ('state', 'failures', 'opened', 'short_circuited'))
+
+
+def is_outage(error):
+    """Проверяет, говорит ли ошибка о недоступности API, а не о запросе."""
+    if isinstance(error, IncorrectAPIRequest):
+        return True
+    if isinstance(error, IncorrectStatusRequest):
+        return (error.status_code is None
+                or error.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR)
+    return False
+
+
+class CircuitBreaker:
+    """Предохранитель вокруг запросов к эндпоинту API Практикума.
+
+    После FAILURE_THRESHOLD сбоев подряд размыкается и сразу отклоняет
+    вызовы. Через RESET_TIMEOUT пропускает один пробный запрос: при успехе
+    замыкается, при сбое снова размыкается.
+    """
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD,
+                 reset_timeout=RESET_TIMEOUT, clock=time.monotonic):
+        """Создает замкнутый предохранитель."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._opened = self._short_circuited = 0
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        if state != self.state:
+            logger.warning(f'Предохранитель API: {self.state} -> {state}')
+            self.state = state
+
+    def before_call(self):
+        """Разрешает вызов или выбрасывает CircuitBreakerOpen."""
+        with self._lock:
+            if self.state == OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    self._short_circuited += 1
+                    raise CircuitBreakerOpen('API Практикума недоступно, '
+                                             'запросы приостановлены.')
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    self._short_circuited += 1
+                    raise CircuitBreakerOpen('API Практикума недоступно, '
+                                             'идет пробный запрос.')
+                self._probing = True
+
+    def record_success(self):
+        """Учитывает успешный вызов."""
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        """Учитывает сбой и при необходимости размыкает предохранитель."""
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if (self.state == HALF_OPEN
+                    or self.failures >= self.failure_threshold):
+                if self.state != OPEN:
+                    self._opened += 1
+                self._set_state(OPEN)
+                self.opened_at = self.clock()
+
+    def record(self, error):
+        """Учитывает исход вызова по выброшенному исключению."""
+        if error is not None and is_outage(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def call(self, func, *args, **kwargs):
+        """Вызывает функцию через предохранитель."""
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            self.record(error)
+            raise
+        self.record_success()
+        return result
+
+    async def call_async(self, func, *args, **kwargs):
+        """Вызывает корутинную функцию через предохранитель."""
+        self.before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as error:
+            self.record(error)
+            raise
+        self.record_success()
+        return result
+
+    def stats(self):
+        """Возвращает состояние, сбои подряд и число отклоненных вызовов."""
+        with self._lock:
+            return BreakerStats(self.state, self.failures, self._opened,
+                                self._short_circuited)
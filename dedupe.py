@@ -0,0 +1,90 @@
+from collections import OrderedDict, namedtuple
+import os
+import threading
+import time
+
+from state_store import homework_identity
+
+
+DEDUPE_CAPACITY = int(os.getenv('DEDUPE_CAPACITY', 100_000))
+DEDUPE_TTL = float(os.getenv('DEDUPE_TTL', 24 * 60 * 60))
+
+DedupeStats = namedtuple(
+    'DedupeStats', ('size', 'hits', 'misses', 'evictions', 'expirations'))
+
+
+def homework_fingerprint(homework):
+    """Возвращает отпечаток уведомления: работа, статус и время смены.
+
+    Повторный переход в тот же статус (работу вернули на проверку после
+    доработки) приходит с новым date_updated и повтором не считается.
+    """
+    if isinstance(homework, dict):
+        date_updated = homework.get('date_updated')
+    else:
+        date_updated = homework.date_updated
+    return ('homework', *homework_identity(homework), date_updated)
+
+
+def error_fingerprint(error):
+    """Возвращает отпечаток уведомления об ошибке: ее класс."""
+    return ('error', type(error).__name__)
+
+
+class DedupeCache:
+    """Недавно отправленные уведомления по чатам: LRU с временем жизни.
+
+    Ключ — пара (чат, отпечаток уведомления). Записей не больше capacity:
+    при переполнении вытесняются давно не встречавшиеся. Через ttl
+    уведомление считается новым, так что затянувшаяся ошибка
+    напоминается раз в ttl, а не при каждом опросе.
+    """
+
+    def __init__(self, capacity=DEDUPE_CAPACITY, ttl=DEDUPE_TTL,
+                 clock=time.monotonic):
+        """Создает пустой кэш заданного размера и времени жизни."""
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+        self._expires = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = self._expirations = 0
+
+    def first_seen(self, chat_id, fingerprint):
+        """Запоминает уведомление и сообщает, нужно ли его отправлять."""
+        key = (chat_id, fingerprint)
+        now = self.clock()
+        with self._lock:
+            expires = self._expires.get(key)
+            if expires is not None and expires > now:
+                self._expires.move_to_end(key)
+                self._hits += 1
+                return False
+            if expires is not None:
+                self._expirations += 1
+            self._expires[key] = now + self.ttl
+            self._expires.move_to_end(key)
+            self._misses += 1
+            self._trim(now)
+            return True
+
+    def _trim(self, now):
+        while self._expires:
+            key, expires = next(iter(self._expires.items()))
+            if expires > now and len(self._expires) <= self.capacity:
+                return
+            del self._expires[key]
+            if expires > now:
+                self._evictions += 1
+            else:
+                self._expirations += 1
+
+    def __len__(self):
+        """Возвращает число запомненных уведомлений."""
+        return len(self._expires)
+
+    def stats(self):
+        """Возвращает размер, попадания, промахи, вытеснения и истечения."""
+        with self._lock:
+            return DedupeStats(len(self._expires), self._hits, self._misses,
+                               self._evictions, self._expirations)
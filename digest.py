@@ -0,0 +1,74 @@
+import os
+
+
+MESSAGE_LIMIT = 4096
+DIGEST_WINDOW = float(os.getenv('DIGEST_WINDOW', 0))
+SEPARATOR = '\n\n'
+HEADER_RESERVE = 40
+
+
+def collapse(texts):
+    """Склеивает одинаковые сообщения, сохраняя порядок первых появлений."""
+    counts = {}
+    for text in texts:
+        counts[text] = counts.get(text, 0) + 1
+    return [text if count == 1 else f'{text} (×{count})'
+            for text, count in counts.items()]
+
+
+def split_long(text, limit):
+    """Режет слишком длинное сообщение по строкам, а строки — по limit."""
+    parts = []
+    current = ''
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:
+            if current:
+                parts.append(current)
+                current = ''
+            parts.append(line[:limit])
+            line = line[limit:]
+        if len(current) + len(line) > limit:
+            parts.append(current)
+            current = ''
+        current += line
+    if current:
+        parts.append(current)
+    return [part.rstrip('\n') for part in parts]
+
+
+def pack(texts, limit):
+    """Раскладывает сообщения по частям не длиннее limit символов."""
+    parts = []
+    current = []
+    size = 0
+    for text in texts:
+        for piece in split_long(text, limit):
+            extra = len(piece) + (len(SEPARATOR) if current else 0)
+            if current and size + extra > limit:
+                parts.append(current)
+                current, size = [], 0
+                extra = len(piece)
+            current.append(piece)
+            size += extra
+    if current:
+        parts.append(current)
+    return parts
+
+
+def build_digests(texts, limit=MESSAGE_LIMIT):
+    """Собирает сообщения одного чата в дайджесты для Telegram.
+
+    Одно сообщение отправляется как есть. Несколько склеиваются под общим
+    заголовком, повторы сворачиваются в одно с числом повторов, а части
+    длиннее limit символов разбиваются на несколько сообщений.
+    """
+    if len(texts) == 1 and len(texts[0]) <= limit:
+        return list(texts)
+    parts = pack(collapse(texts), limit - HEADER_RESERVE)
+    digests = []
+    for number, part in enumerate(parts, start=1):
+        header = f'Обновлений: {len(texts)}'
+        if len(parts) > 1:
+            header += f' (часть {number} из {len(parts)})'
+        digests.append(header + SEPARATOR + SEPARATOR.join(part))
+    return digests
@@ -2,7 +2,23 @@ class IncorrectAPIRequest(Exception):
     pass
 
 class IncorrectStatusRequest(Exception):
-    pass
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
 
 class IncorrectKeyCurrentDate(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class CircuitBreakerOpen(Exception):
+    pass
+
+class IncorrectResponse(Exception):
+    def __init__(self, errors):
+        super().__init__('; '.join(
+            f'{error.path}: {error.message}' for error in errors))
+        self.errors = errors
+
+class RetryAfter(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f'Повторить через {retry_after} с.')
+        self.retry_after = retry_after
\ No newline at end of file
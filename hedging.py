@@ -0,0 +1,177 @@
+import asyncio
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import os
+import threading
+import time
+
+from exceptions import IncorrectAPIRequest
+
+
+POLL_DEADLINE = float(os.getenv('POLL_DEADLINE', 45))
+HEDGE_AFTER = float(os.getenv('HEDGE_AFTER', 2))
+HEDGE_QUANTILE = 0.95
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 20
+HEDGE_WORKERS = 64
+
+HedgeStats = namedtuple(
+    'HedgeStats', ('calls', 'hedged', 'hedge_wins', 'timeouts', 'threshold'))
+
+
+class LatencyTracker:
+    """Скользящее окно задержек успешных запросов."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        """Создает окно заданного размера."""
+        self.samples = deque(maxlen=window)
+
+    def record(self, latency):
+        """Добавляет задержку в окно."""
+        self.samples.append(latency)
+
+    def quantile(self, share):
+        """Возвращает квантиль задержек или None при пустом окне."""
+        samples = sorted(self.samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * share))]
+
+
+class HedgedCaller:
+    """Ограничивает опрос сроком и дублирует запросы, отстающие от p95.
+
+    Если запрос не ответил за p95 недавних задержек (или за HEDGE_AFTER,
+    пока замеров мало), запускается второй такой же; побеждает тот,
+    кто первым ответит успешно. Одна попытка длится не дольше deadline;
+    срок опроса вместе с повторами держит Retrier с тем же deadline.
+    Ожидание в ограничителе должно пройти до вызова: задержка считается
+    с начала запроса, а дубль запускается, только если may_hedge()
+    разрешает его сразу (например, в ограничителе есть свободный токен).
+    """
+
+    def __init__(self, deadline=POLL_DEADLINE, hedge=True,
+                 hedge_after=HEDGE_AFTER, quantile=HEDGE_QUANTILE,
+                 min_samples=MIN_SAMPLES, max_workers=HEDGE_WORKERS):
+        """Задает срок опроса и порог дублирования."""
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='hedge')
+        self._lock = threading.Lock()
+        self._calls = self._hedged = self._hedge_wins = self._timeouts = 0
+
+    def threshold(self):
+        """Возвращает задержку, после которой запрос дублируется."""
+        if len(self.latencies.samples) < self.min_samples:
+            return self.hedge_after
+        return self.latencies.quantile(self.quantile)
+
+    def _count(self, calls=0, hedged=0, hedge_wins=0, timeouts=0):
+        with self._lock:
+            self._calls += calls
+            self._hedged += hedged
+            self._hedge_wins += hedge_wins
+            self._timeouts += timeouts
+
+    def _won(self, sent, hedge_won):
+        self.latencies.record(time.monotonic() - sent)
+        self._count(hedge_wins=int(hedge_won))
+
+    @staticmethod
+    def _timed(func, *args, **kwargs):
+        sent = time.monotonic()
+        return sent, func(*args, **kwargs)
+
+    @staticmethod
+    async def _timed_async(func, *args, **kwargs):
+        sent = time.monotonic()
+        return sent, await func(*args, **kwargs)
+
+    def _deadline_error(self):
+        self._count(timeouts=1)
+        return IncorrectAPIRequest(f'Нет ответа API за {self.deadline} с.')
+
+    def call(self, func, *args, may_hedge=None, **kwargs):
+        """Вызывает функцию в пределах срока, при задержке дублируя ее."""
+        self._count(calls=1)
+        started = time.monotonic()
+        primary = self.executor.submit(self._timed, func, *args, **kwargs)
+        pending = {primary}
+        if self.hedge:
+            done, _ = wait(pending, timeout=min(self.threshold(),
+                                                self.deadline))
+            if (not done and time.monotonic() - started < self.deadline
+                    and (may_hedge is None or may_hedge())):
+                self._count(hedged=1)
+                pending.add(self.executor.submit(self._timed, func, *args,
+                                                 **kwargs))
+        error = None
+        while pending:
+            remaining = self.deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    sent, result = future.result()
+                    self._won(sent, future is not primary)
+                    return result
+                error = future.exception()
+        if pending or error is None:
+            raise self._deadline_error()
+        raise error
+
+    async def call_async(self, func, *args, may_hedge=None, **kwargs):
+        """Вызывает корутинную функцию в пределах срока с дублированием."""
+        self._count(calls=1)
+        started = time.monotonic()
+        primary = asyncio.ensure_future(
+            self._timed_async(func, *args, **kwargs))
+        pending = {primary}
+        try:
+            if self.hedge:
+                done, _ = await asyncio.wait(
+                    pending, timeout=min(self.threshold(), self.deadline))
+                if (not done and time.monotonic() - started < self.deadline
+                        and (may_hedge is None or may_hedge())):
+                    self._count(hedged=1)
+                    pending.add(asyncio.ensure_future(
+                        self._timed_async(func, *args, **kwargs)))
+            error = None
+            while pending:
+                remaining = self.deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining,
+                    return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        sent, result = task.result()
+                        self._won(sent, task is not primary)
+                        return result
+                    error = task.exception()
+            if pending or error is None:
+                raise self._deadline_error()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self):
+        """Возвращает число вызовов, дублей, побед дублей и сбоев по сроку."""
+        with self._lock:
+            return HedgeStats(self._calls, self._hedged, self._hedge_wins,
+                              self._timeouts, self.threshold())
+
+    def shutdown(self):
+        """Останавливает пул потоков, не дожидаясь зависших запросов."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,7 +1,7 @@
 from http import HTTPStatus
 import json
 import logging
-from logging.handlers import RotatingFileHandler
+import math
 import os
 from pathlib import Path
 import sys
@@ -11,40 +11,66 @@ from dotenv import load_dotenv
 import requests
 import telebot
 
+from constants import (ENDPOINT, HOMEWORK_VERDICTS, RETRY_PERIOD,
+                       STATUS_MESSAGE)
+from dedupe import DedupeCache, error_fingerprint, homework_fingerprint
 from exceptions import (IncorrectAPIRequest, IncorrectKeyCurrentDate,
-                        IncorrectStatusRequest)
+                        IncorrectStatusRequest, RetryAfter)
+from log_format import LOG_FORMAT, JsonFormatter, RepeatSampler
+from log_queue import start_log_listener
+from log_rotation import CompressingRotatingFileHandler
+from metrics import (METRICS_PORT, bind_stats, check_seconds, count_error,
+                     dedupe_stats, log_queue_depth, parse_seconds,
+                     request_seconds, send_seconds, start_metrics_server,
+                     timed)
+from outbound import OutboundQueue
+from retries import Retrier
+from state_store import StateStore
+from telegram_sender import TelegramSender
 
 
 load_dotenv()
 
 
 BASE_DIR = Path(__file__).resolve().parent
-Path(BASE_DIR / "logs").mkdir(exist_ok=True)
-
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-logging.Formatter('%(asctime)s, %(levelname)s, %(message)s, %(name)s')
-handler = RotatingFileHandler(
-    BASE_DIR / 'logs/my_logger.log',
-    mode='a',
-    maxBytes=50 * 1024 * 1024,
-    backupCount=5)
-logger.addHandler(handler)
+LOG_FILE = Path(os.getenv('LOG_FILE', BASE_DIR / 'logs/my_logger.log'))
+
+logger = logging.getLogger('homework')
 
 PRACTICUM_TOKEN = os.getenv('PRAKTIKUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+STATE_DB = os.getenv('STATE_DB')
+SEND_QUEUE_SIZE = int(os.getenv('SEND_QUEUE_SIZE', 0))
 
-RETRY_PERIOD = 600
-ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+CONNECT_TIMEOUT = float(os.getenv('CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.getenv('READ_TIMEOUT', 30))
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
+log_handler = None
+outbound = None
+
 
-HOMEWORK_VERDICTS = {
-    'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
-    'reviewing': 'Работа взята на проверку ревьюером.',
-    'rejected': 'Работа проверена: у ревьюера есть замечания.'
-}
+def setup_logging():
+    """Включает запись лога в файл через фоновый поток; только один раз."""
+    global log_handler
+    if log_handler is None:
+        LOG_FILE.parent.mkdir(exist_ok=True)
+        logger.setLevel(logging.DEBUG)
+        if LOG_FORMAT == 'json':
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(
+                '%(asctime)s, %(levelname)s, %(message)s, %(name)s')
+        handler = CompressingRotatingFileHandler(
+            LOG_FILE,
+            max_bytes=50 * 1024 * 1024)
+        handler.setFormatter(formatter)
+        log_handler = start_log_listener(logger, handler)
+        log_handler.addFilter(RepeatSampler(log_handler).start())
+        log_queue_depth.set_function(log_handler.depth)
+    return log_handler
 
 
 def check_tokens():
@@ -65,28 +91,100 @@ def check_tokens():
 
 
 def send_message(bot, message):
-    """Отправляет сообщение в Telegram-чат."""
+    """Ставит сообщение в очередь отправки или отправляет его сразу."""
+    if outbound is not None:
+        outbound.put(TELEGRAM_CHAT_ID, message)
+    else:
+        send_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_to_chat(bot, chat_id, message):
+    """Отправляет сообщение в указанный Telegram-чат."""
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        timed(send_seconds, bot.send_message, chat_id, message)
     except telebot.apihelper.ApiException as error:
+        count_error(error)
         logger.error(f'Ошибка отправки сообщения: {error}')
+        return False
+    logger.debug('Отправлено сообщение')
+    return True
+
+
+def start_outbound(bot, store=None):
+    """Запускает очередь отправки, если задан SEND_QUEUE_SIZE."""
+    global outbound
+    if SEND_QUEUE_SIZE and outbound is None:
+        outbound = OutboundQueue(
+            TelegramSender(bot, logger=logger), SEND_QUEUE_SIZE,
+            on_done=store.acknowledge if store else None,
+            on_failed=store.return_entry if store else None,
+            logger=logger).start()
+    return outbound
+
+
+def notify(bot, store, message):
+    """Отправляет сообщение, а при хранилище пишет его в outbox."""
+    if store:
+        store.enqueue(TELEGRAM_CHAT_ID, message)
     else:
-        logger.debug('Отправлено сообщение')
+        send_message(bot, message)
 
 
-def get_api_answer(timestamp):
-    """Делает запрос к единственному эндпоинту API-сервиса."""
+def send_outbox(bot, store):
+    """Отправляет зафиксированные в outbox уведомления.
+
+    Отправка идет через TelegramSender с лимитами Telegram. Уведомление
+    забывается после ответа Telegram, в том числе окончательного отказа.
+    При 429, ошибке сервера или сбое сети оно возвращается в outbox
+    до следующего опроса.
+    """
+    if not store:
+        return
+    send = TelegramSender(bot, defer_after=math.inf, logger=logger)
+    for entry in store.take_outbox():
+        if outbound is not None:
+            outbound.put(entry.chat_id, entry.text, entry.id)
+            continue
+        try:
+            timed(send_seconds, send, entry.chat_id, entry.text)
+        except Exception as error:
+            if not isinstance(error, RetryAfter):
+                count_error(error)
+                logger.error(f'Ошибка отправки сообщения: {error}')
+            store.return_entry(entry)
+            return
+        store.acknowledge(entry.id)
+
+
+def make_headers(token):
+    """Формирует заголовки авторизации для токена Практикума."""
+    return {'Authorization': f'OAuth {token}'}
+
+
+def request_api(get, url, headers, timestamp, **kwargs):
+    """Запрашивает статусы работ через переданную функцию get."""
     payload = {'from_date': timestamp}
+    started = time.perf_counter()
     try:
-        response = requests.get(ENDPOINT, headers=HEADERS, params=payload)
+        response = get(url, headers=headers, params=payload, **kwargs)
         if response.status_code != HTTPStatus.OK:
-            raise IncorrectStatusRequest('Статус запроса не 200')
+            raise IncorrectStatusRequest('Статус запроса не 200',
+                                         response.status_code)
         return response.json()
     except requests.RequestException as error:
-        raise IncorrectAPIRequest(f'Ошибка при выполнении запроса: {error}')
+        raise IncorrectAPIRequest(
+            f'Ошибка при выполнении запроса: {error}') from error
     except json.JSONDecodeError as error:
         raise ValueError(f'Данные не являются'
                          f'допустимым документом JSON {error}')
+    finally:
+        request_seconds.observe(time.perf_counter() - started)
+
+
+def get_api_answer(timestamp):
+    """Делает запрос к единственному эндпоинту API-сервиса."""
+    return request_api(requests.get, ENDPOINT, HEADERS, timestamp,
+                       timeout=REQUEST_TIMEOUT)
 
 
 def check_response(response):
@@ -117,39 +215,122 @@ def parse_status(homework):
     if not verdict:
         raise ValueError('Ответ последней домашней'
                          'не соответствует стандартным или отсуствует.')
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+    return status_message(homework_name, verdict)
+
+
+def status_message(homework_name, verdict):
+    """Формирует сообщение об изменении статуса работы."""
+    return STATUS_MESSAGE.format(homework_name, verdict)
+
+
+def order_homeworks(homeworks):
+    """Убирает повторы по id и статусу и сортирует работы по дате."""
+    unique = {}
+    for homework in homeworks:
+        key = (homework.get('id', homework.get('homework_name')),
+               homework.get('status'))
+        unique.setdefault(key, homework)
+    return sorted(unique.values(),
+                  key=lambda homework: homework.get('date_updated') or '')
+
+
+def homework_messages(homeworks):
+    """Выдает пары (отпечаток, сообщение) для работ ответа по дате.
+
+    Ошибка разбора одной работы становится сообщением об ошибке
+    и не мешает остальным работам ответа.
+    """
+    for homework in order_homeworks(homeworks):
+        try:
+            message = timed(parse_seconds, parse_status, homework)
+        except Exception as error:
+            count_error(error)
+            message = f'Ошибка работы программы: {error}'
+            logger.error(message, extra={
+                'tenant': TELEGRAM_CHAT_ID, 'homework_id': homework.get('id'),
+                'phase': 'parse'})
+            yield error_fingerprint(error), message
+        else:
+            yield homework_fingerprint(homework), message
+
+
+def load_state(store):
+    """Возвращает сохраненные метку времени и последнее сообщение."""
+    saved = store.load(PRACTICUM_TOKEN) if store else None
+    return saved or (int(time.time()), '')
+
+
+def filter_known(store, homeworks):
+    """Убирает работы, статус которых уже известен хранилищу."""
+    if not store:
+        return homeworks
+    return store.new_homeworks(PRACTICUM_TOKEN, homeworks)
+
+
+def start_metrics():
+    """Запускает HTTP-сервер метрик, если задан METRICS_PORT."""
+    if METRICS_PORT:
+        server = start_metrics_server(METRICS_PORT)
+        logger.debug(f'Метрики доступны на порту {server.server_port}')
+        return server
+    return None
+
+
+def save_state(store, timestamp, last_message):
+    """Сохраняет состояние опроса, если хранилище подключено."""
+    if store:
+        store.save(PRACTICUM_TOKEN, timestamp, last_message)
+        store.flush()
 
 
 def main():
     """Основная логика работы бота."""
+    setup_logging()
     logger.debug('Бот запущен')
     bot = telebot.TeleBot(token=TELEGRAM_TOKEN)
     if not check_tokens():
         sys.exit("error")
-    timestamp = int(time.time())
-    last_message = ''
+    store = StateStore(STATE_DB) if STATE_DB else None
+    timestamp, last_message = load_state(store)
+    retrier = Retrier(logger=logger)
+    dedupe = DedupeCache()
+    bind_stats(dedupe_stats, dedupe.stats)
+    start_outbound(bot, store)
+    start_metrics()
     while True:
+        started = time.monotonic()
         try:
-            api_answer = get_api_answer(timestamp)
-            last_homeworks = check_response(api_answer)
+            api_answer = retrier.call(get_api_answer, timestamp)
+            last_homeworks = timed(check_seconds, check_response,
+                                   api_answer)
             timestamp = api_answer['current_date']
             if last_homeworks:
-                message = parse_status(api_answer.get('homeworks')[0])
-                if message != last_message:
-                    last_message = message
-                    send_message(bot, message)
+                for fingerprint, message in homework_messages(
+                        filter_known(store, last_homeworks)):
+                    if message != last_message and dedupe.first_seen(
+                            TELEGRAM_CHAT_ID, fingerprint):
+                        last_message = message
+                        notify(bot, store, message)
             else:
-                logger.debug('Новые статусы отсутствуют.')
+                logger.debug('Новые статусы отсутствуют.', extra={
+                    'tenant': TELEGRAM_CHAT_ID, 'phase': 'idle',
+                    'duration': time.monotonic() - started})
         except Exception as error:
+            count_error(error)
             message = f'Ошибка работы программы: {error}'
-            if message != last_message:
-                send_message(bot, message)
+            if message != last_message and dedupe.first_seen(
+                    TELEGRAM_CHAT_ID, error_fingerprint(error)):
+                notify(bot, store, message)
                 last_message = message
-            logger.error(message)
+            logger.error(message, extra={
+                'tenant': TELEGRAM_CHAT_ID, 'phase': 'poll',
+                'duration': time.monotonic() - started})
         except IncorrectKeyCurrentDate as error:
             message = f'Ошибка работы программы: {error}'
             logger.error(message)
         finally:
+            save_state(store, timestamp, last_message)
+            send_outbox(bot, store)
             time.sleep(RETRY_PERIOD)
 
 
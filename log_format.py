@@ -0,0 +1,132 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+LOG_SAMPLE_WINDOW = float(os.getenv('LOG_SAMPLE_WINDOW', 60))
+FIELDS = ('tenant', 'homework_id', 'phase', 'duration', 'count', 'tenants')
+SAMPLED_PHASES = ('idle',)
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись лога одной строкой JSON.
+
+    Кроме времени, уровня, логгера и текста в строку попадают
+    переданные через extra поля из fields, если они заданы.
+    """
+
+    def __init__(self, fields=FIELDS):
+        """Создает форматтер с перечнем структурных полей."""
+        super().__init__()
+        self.fields = fields
+        self._second = (None, '')
+
+    def formatTime(self, record, datefmt=None):
+        """Возвращает время записи в ISO 8601, кешируя секунды."""
+        second, text = self._second
+        if second != int(record.created):
+            second = int(record.created)
+            text = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second))
+            self._second = (second, text)
+        return f'{text}.{int(record.msecs):03d}'
+
+    def format(self, record):
+        """Собирает запись в словарь и сериализует его в JSON."""
+        document = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        attributes = record.__dict__
+        for field in self.fields:
+            value = attributes.get(field)
+            if value is not None:
+                document[field] = value
+        if record.exc_info:
+            document['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(document, ensure_ascii=False, default=str)
+
+
+class RepeatSampler(logging.Filter):
+    """Сворачивает повторяющиеся отладочные записи в периодическую сводку.
+
+    Записи DEBUG с phase из phases не пропускаются сразу, а считаются
+    по паре (текст, phase) для всех студентов вместе. Раз в window секунд
+    фоновый поток отдает handler по одной записи на пару: число записей
+    в поле count и в тексте, число студентов — в поле tenants.
+    При window <= 0 записи не сворачиваются.
+    """
+
+    def __init__(self, handler, window=LOG_SAMPLE_WINDOW,
+                 phases=SAMPLED_PHASES, clock=time.monotonic):
+        """Создает фильтр, отдающий сводки в handler."""
+        super().__init__()
+        self.handler = handler
+        self.window = window
+        self.phases = phases
+        self.clock = clock
+        self.suppressed = 0
+        self._pending = {}
+        self._since = clock()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def filter(self, record):
+        """Пропускает запись или учитывает ее в будущей сводке."""
+        if (self.window <= 0 or record.levelno > logging.DEBUG
+                or getattr(record, 'phase', None) not in self.phases
+                or getattr(record, 'count', None) is not None):
+            return True
+        key = (record.msg, record.phase)
+        with self._lock:
+            summary = self._pending.get(key)
+            if summary is None:
+                summary = self._pending[key] = [record, 0, set()]
+            summary[1] += 1
+            summary[2].add(getattr(record, 'tenant', None))
+            self.suppressed += 1
+        return False
+
+    def flush(self):
+        """Отдает handler сводки по записям, накопленным с прошлого раза."""
+        now = self.clock()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            elapsed, self._since = now - self._since, now
+        for record, count, tenants in pending.values():
+            tenants.discard(None)
+            summary = logging.LogRecord(
+                record.name, record.levelno, record.pathname, record.lineno,
+                f'{record.getMessage()} (×{count} за {elapsed:.0f} с, '
+                f'студентов: {len(tenants)})', None, None)
+            summary.phase = record.phase
+            summary.count = count
+            summary.tenants = len(tenants)
+            self.handler.handle(summary)
+
+    def start(self):
+        """Запускает поток, выпускающий сводки раз в window секунд."""
+        if self.window > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True,
+                                            name='log-sampler')
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def _run(self):
+        while not self._stopped.wait(self.window):
+            self.flush()
+
+    def stop(self):
+        """Останавливает поток и выпускает последние сводки."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
@@ -0,0 +1,74 @@
+import atexit
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import threading
+
+
+LOG_QUEUE_SIZE = 10_000
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Кладет записи лога в ограниченную очередь, не дожидаясь диска.
+
+    Запись на диск делает фоновый QueueListener. Если очередь полна,
+    запись отбрасывается и учитывается в dropped по уровням.
+    """
+
+    def __init__(self, maxsize=LOG_QUEUE_SIZE):
+        """Создает обработчик с очередью на maxsize записей."""
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = Counter()
+        self._lock_dropped = threading.Lock()
+
+    def enqueue(self, record):
+        """Ставит запись в очередь или отбрасывает ее при переполнении."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_dropped:
+                self.dropped[record.levelname] += 1
+
+    def depth(self):
+        """Возвращает число записей, ожидающих записи на диск."""
+        return self.queue.qsize()
+
+
+class BoundedQueueListener(QueueListener):
+    """QueueListener, который может остановиться и при полной очереди."""
+
+    def enqueue_sentinel(self):
+        """Дожидается места в очереди для метки остановки."""
+        self.queue.put(self._sentinel)
+
+
+def stop_listener(listener):
+    """Дописывает очередь на диск и останавливает поток записи."""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def start_log_listener(logger, *handlers, maxsize=LOG_QUEUE_SIZE):
+    """Переводит логгер на фоновую запись через переданные обработчики.
+
+    Обработчики снимаются с логгера и обслуживаются QueueListener
+    в отдельном потоке; на логгере остается BoundedQueueHandler.
+    Повторный вызов для того же логгера заменяет прежнюю очередь.
+    При выходе из программы очередь дописывается на диск.
+    """
+    for old in [handler for handler in logger.handlers
+                if isinstance(handler, BoundedQueueHandler)]:
+        logger.removeHandler(old)
+        stop_listener(old.listener)
+        for handler in old.listener.handlers:
+            if handler not in handlers:
+                handler.close()
+    for handler in handlers:
+        logger.removeHandler(handler)
+    queue_handler = BoundedQueueHandler(maxsize)
+    queue_handler.listener = BoundedQueueListener(
+        queue_handler.queue, *handlers, respect_handler_level=True)
+    queue_handler.listener.start()
+    atexit.register(stop_listener, queue_handler.listener)
+    logger.addHandler(queue_handler)
+    return queue_handler
@@ -0,0 +1,151 @@
+from collections import namedtuple
+from datetime import datetime
+import glob
+import gzip
+from logging.handlers import RotatingFileHandler
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+
+
+LOG_RETENTION_BYTES = int(os.getenv('LOG_RETENTION_BYTES',
+                                    100 * 1024 * 1024))
+LOG_RETENTION_DAYS = float(os.getenv('LOG_RETENTION_DAYS', 30))
+SEGMENT_FORMAT = '%Y%m%d-%H%M%S-%f'
+
+CompressionStats = namedtuple('CompressionStats', (
+    'segments', 'original_bytes', 'compressed_bytes', 'removed',
+    'bytes_saved', 'failures'))
+
+
+class LogCompressor:
+    """Фоновое сжатие ротированных сегментов лога и их удаление по сроку.
+
+    Сегмент сжимается gzip в отдельном потоке, так что запись лога
+    не ждет сжатия. После каждого сжатия удаляются архивы старше max_age
+    и самые старые архивы, пока их общий размер больше max_bytes.
+    Ошибки файловой системы не останавливают поток: они считаются
+    в stats().failures и пишутся в stderr, ведь сам лог их не примет.
+    """
+
+    def __init__(self, base_filename, max_bytes=LOG_RETENTION_BYTES,
+                 max_age=LOG_RETENTION_DAYS * 24 * 60 * 60):
+        """Запускает поток сжатия для сегментов файла base_filename."""
+        self.base_filename = base_filename
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._segments = self._original = self._compressed = 0
+        self._removed = self._failures = 0
+        self._thread = threading.Thread(target=self._work, daemon=True,
+                                        name='log-compressor')
+        self._thread.start()
+
+    def submit(self, path):
+        """Ставит сегмент в очередь на сжатие."""
+        self.queue.put(path)
+
+    def pending_segments(self):
+        """Возвращает несжатые сегменты, оставшиеся от прошлых запусков."""
+        return sorted(path for path in glob.glob(f'{self.base_filename}.*')
+                      if not path.endswith(('.gz', '.tmp')))
+
+    def archives(self):
+        """Возвращает сжатые сегменты, от старых к новым."""
+        return sorted(glob.glob(f'{self.base_filename}.*.gz'),
+                      key=os.path.getmtime)
+
+    def _work(self):
+        while True:
+            path = self.queue.get()
+            try:
+                self._compress(path)
+                self._apply_retention()
+            except OSError as error:
+                with self._lock:
+                    self._failures += 1
+                sys.stderr.write(f'Ошибка сжатия сегмента лога {path}: '
+                                 f'{error}\n')
+            finally:
+                self.queue.task_done()
+
+    def _compress(self, path):
+        target = f'{path}.gz'
+        with open(path, 'rb') as source, \
+                gzip.open(f'{target}.tmp', 'wb') as archive:
+            shutil.copyfileobj(source, archive)
+        os.replace(f'{target}.tmp', target)
+        original = os.path.getsize(path)
+        os.remove(path)
+        with self._lock:
+            self._segments += 1
+            self._original += original
+            self._compressed += os.path.getsize(target)
+
+    def _apply_retention(self):
+        archives = [(path, os.stat(path)) for path in self.archives()]
+        oldest = time.time() - self.max_age
+        total = sum(stat.st_size for _, stat in archives)
+        for path, stat in archives:
+            if stat.st_mtime >= oldest and total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= stat.st_size
+            with self._lock:
+                self._removed += 1
+
+    def join(self):
+        """Ждет сжатия всех поставленных сегментов."""
+        self.queue.join()
+
+    def stats(self):
+        """Возвращает сжатые сегменты, объемы, удаленные архивы и сбои."""
+        with self._lock:
+            return CompressionStats(
+                self._segments, self._original, self._compressed,
+                self._removed, self._original - self._compressed,
+                self._failures)
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler, сжимающий ротированные сегменты в фоне.
+
+    При ротации файл лишь переименовывается в сегмент с меткой времени,
+    сжатием и удалением старых архивов занимается LogCompressor.
+    Число архивов ограничивается не backupCount, а размером и сроком.
+    """
+
+    def __init__(self, filename, max_bytes=0, retention_bytes=None,
+                 retention_age=None, encoding=None, delay=False):
+        """Открывает файл лога и дожимает сегменты прошлых запусков."""
+        super().__init__(filename, mode='a', maxBytes=max_bytes,
+                         encoding=encoding, delay=delay)
+        retention = {}
+        if retention_bytes is not None:
+            retention['max_bytes'] = retention_bytes
+        if retention_age is not None:
+            retention['max_age'] = retention_age
+        self.compressor = LogCompressor(self.baseFilename, **retention)
+        for path in self.compressor.pending_segments():
+            self.compressor.submit(path)
+
+    def doRollover(self):
+        """Переименовывает текущий файл в сегмент и отдает его на сжатие."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename):
+            stamp = datetime.now().strftime(SEGMENT_FORMAT)
+            segment = f'{self.baseFilename}.{stamp}'
+            number = 0
+            while os.path.exists(segment) or os.path.exists(f'{segment}.gz'):
+                number += 1
+                segment = f'{self.baseFilename}.{stamp}-{number}'
+            os.rename(self.baseFilename, segment)
+            self.compressor.submit(segment)
+        if not self.delay:
+            self.stream = self._open()
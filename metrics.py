@@ -0,0 +1,318 @@
+from bisect import bisect_left
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import math
+import os
+import threading
+import time
+
+
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1, 2.5, 5, 10, 30)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Counter:
+    """Монотонно растущий счетчик."""
+
+    __slots__ = ('_value', '_lock')
+
+    def __init__(self):
+        """Создает счетчик с нулевым значением."""
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """Увеличивает счетчик на amount."""
+        with self._lock:
+            self._value += amount
+
+    def value(self):
+        """Возвращает текущее значение."""
+        return self._value
+
+
+class Gauge:
+    """Значение, которое задается напрямую или читается функцией."""
+
+    __slots__ = ('_value', '_function', '_lock')
+
+    def __init__(self):
+        """Создает датчик с нулевым значением."""
+        self._value = 0
+        self._function = None
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        """Задает значение датчика."""
+        self._value = value
+
+    def inc(self, amount=1):
+        """Увеличивает значение на amount."""
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        """Уменьшает значение на amount."""
+        self.inc(-amount)
+
+    def set_function(self, function):
+        """Читает значение вызовом function при каждом сборе метрик."""
+        self._function = function
+
+    def value(self):
+        """Возвращает текущее значение."""
+        function = self._function
+        return function() if function else self._value
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин.
+
+    observe ищет корзину двоичным поиском и увеличивает одну ячейку;
+    накопленные значения считаются только при сборе метрик.
+    """
+
+    __slots__ = ('buckets', '_counts', '_sum', '_lock')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """Создает гистограмму с верхними границами корзин buckets."""
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """Учитывает одно наблюдение."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self):
+        """Возвращает накопленные счетчики по корзинам и сумму."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = []
+        running = 0
+        for bound, count in zip((*self.buckets, math.inf), counts):
+            running += count
+            cumulative.append((bound, running))
+        return cumulative, total
+
+
+def timed(histogram, function, *args, **kwargs):
+    """Вызывает function и записывает время вызова в histogram."""
+    started = time.perf_counter()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        histogram.observe(time.perf_counter() - started)
+
+
+def format_value(value):
+    """Форматирует число для текстового формата Prometheus."""
+    if value == math.inf:
+        return '+Inf'
+    if type(value) is float and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def format_labels(names, values):
+    """Форматирует метки в виде {name="value",...}."""
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\')
+                         .replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in zip(names, values))
+    return f'{{{pairs}}}'
+
+
+class Family:
+    """Метрика с именем, описанием и значениями по наборам меток."""
+
+    def __init__(self, kind, name, documentation, labels, factory):
+        """Создает семейство; без меток значение создается сразу."""
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.factory = factory
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            self._children[()] = factory()
+
+    def labels(self, *values):
+        """Возвращает значение метрики для набора меток."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f'Метрика {self.name} ожидает метки '
+                                 f'{self.label_names}, получено {values}')
+            with self._lock:
+                child = self._children.setdefault(values, self.factory())
+        return child
+
+    def render(self):
+        """Возвращает строки метрики в текстовом формате Prometheus."""
+        documentation = (self.documentation.replace('\\', r'\\')
+                         .replace('\n', r'\n'))
+        lines = [f'# HELP {self.name} {documentation}',
+                 f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            if self.kind != 'histogram':
+                labels = format_labels(self.label_names, values)
+                lines.append(f'{self.name}{labels} '
+                             f'{format_value(child.value())}')
+                continue
+            cumulative, total = child.snapshot()
+            names = (*self.label_names, 'le')
+            for bound, count in cumulative:
+                labels = format_labels(names,
+                                       (*values, format_value(bound)))
+                lines.append(f'{self.name}_bucket{labels} {count}')
+            labels = format_labels(self.label_names, values)
+            lines.append(f'{self.name}_sum{labels} {format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative[-1][1]}')
+        return lines
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса.
+
+    Метрика без меток возвращается сразу значением (Counter, Gauge,
+    Histogram), с метками — семейством, значения которого берутся
+    через labels(...). Повторная регистрация имени возвращает уже
+    созданную метрику того же вида.
+    """
+
+    def __init__(self):
+        """Создает пустой реестр."""
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _register(self, kind, name, documentation, labels, factory):
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = Family(
+                    kind, name, documentation, labels, factory)
+            elif family.kind != kind or family.label_names != tuple(labels):
+                raise ValueError(f'Метрика {name} уже зарегистрирована '
+                                 f'как {family.kind} {family.label_names}')
+        return family if labels else family.labels()
+
+    def counter(self, name, documentation, labels=()):
+        """Регистрирует счетчик."""
+        return self._register('counter', name, documentation, labels,
+                              Counter)
+
+    def gauge(self, name, documentation, labels=()):
+        """Регистрирует датчик."""
+        return self._register('gauge', name, documentation, labels, Gauge)
+
+    def histogram(self, name, documentation, labels=(),
+                  buckets=LATENCY_BUCKETS):
+        """Регистрирует гистограмму с границами корзин buckets."""
+        return self._register('histogram', name, documentation, labels,
+                              lambda: Histogram(buckets))
+
+    def render(self):
+        """Возвращает все метрики в текстовом формате Prometheus."""
+        with self._lock:
+            families = list(self._families.values())
+        lines = []
+        for family in families:
+            lines.extend(family.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+poll_seconds = registry.histogram(
+    'homework_poll_seconds', 'Время этапов опроса API Практикума.',
+    labels=('stage',))
+request_seconds = poll_seconds.labels('request')
+check_seconds = poll_seconds.labels('check')
+parse_seconds = poll_seconds.labels('parse')
+send_seconds = registry.histogram(
+    'homework_send_seconds', 'Время отправки сообщения в Telegram.')
+errors_total = registry.counter(
+    'homework_errors_total', 'Ошибки опроса и отправки по классам.',
+    labels=('exception',))
+send_queue_depth = registry.gauge(
+    'homework_send_queue_depth', 'Сообщения в очереди отправки.')
+log_queue_depth = registry.gauge(
+    'homework_log_queue_depth', 'Записи лога, ожидающие записи на диск.')
+outbound_stats = registry.gauge(
+    'homework_outbound', 'Счетчики очереди отправки (QueueStats).',
+    labels=('field',))
+limiter_stats = registry.gauge(
+    'homework_api_limiter',
+    'Ограничитель запросов к API: запросы и время ожидания, с.',
+    labels=('field',))
+breaker_stats = registry.gauge(
+    'homework_api_breaker',
+    'Предохранитель API: сбои подряд, размыкания и отклоненные вызовы.',
+    labels=('field',))
+breaker_state = registry.gauge(
+    'homework_api_breaker_state',
+    'Состояние предохранителя API: 1 у текущего.', labels=('state',))
+dedupe_stats = registry.gauge(
+    'homework_dedupe', 'Кэш отправленных уведомлений (DedupeStats).',
+    labels=('field',))
+
+
+def bind_stats(family, stats):
+    """Показывает числовые поля stats() датчиками family с меткой field.
+
+    Значения читаются вызовом stats() при каждом сборе метрик;
+    нечисловые поля пропускаются.
+    """
+    for field, value in stats()._asdict().items():
+        if isinstance(value, (int, float)):
+            family.labels(field).set_function(
+                lambda field=field: getattr(stats(), field))
+
+
+def count_error(error):
+    """Учитывает ошибку по имени класса исключения."""
+    errors_total.labels(type(error).__name__).inc()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Отдает метрики реестра сервера по GET /metrics."""
+
+    def do_GET(self):
+        """Отвечает текстом метрик или 404 для других путей."""
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Не пишет запросы сборщика метрик в stderr."""
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST,
+                         metrics=registry):
+    """Запускает HTTP-сервер метрик в фоновом потоке."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    server.registry = metrics
+    thread = threading.Thread(target=server.serve_forever, daemon=True,
+                              name='metrics')
+    thread.start()
+    return server
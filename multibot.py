@@ -0,0 +1,121 @@
+import argparse
+import os
+import sys
+
+import telebot
+
+from api_client import build_client
+from async_engine import run_asyncio
+from backfill import backfill
+from homework import (STATE_DB, TELEGRAM_TOKEN, logger, setup_logging,
+                      start_metrics)
+from metrics import bind_stats, dedupe_stats
+from outbound import OutboundQueue
+from scheduler import AdaptivePolicy, DeadlineScheduler
+from state_store import StateStore
+from telegram_sender import TelegramSender
+from tenants import TenantRegistry, poll_tenant
+from thread_engine import run_threads
+
+
+TENANTS_FILE = os.getenv('TENANTS_FILE', 'tenants.txt')
+
+
+def run_sequential(registry, store):
+    """Опрашивает студентов по очереди, когда подходит их срок."""
+    bot = telebot.TeleBot(token=TELEGRAM_TOKEN)
+    policy = AdaptivePolicy()
+    policy.stagger(registry)
+    scheduler = DeadlineScheduler(registry)
+    send = TelegramSender(bot, logger=logger)
+    with build_client() as client, \
+            OutboundQueue(send, on_done=store.acknowledge,
+                          on_failed=store.return_entry,
+                          logger=logger) as outbound:
+        while True:
+            for tenant in scheduler.pop_due():
+                messages = poll_tenant(client, tenant, store)
+                policy.decide(tenant)
+                scheduler.push(tenant)
+                for message in messages:
+                    store.enqueue(tenant.chat_id, message)
+                store.maybe_flush()
+            store.flush()
+            outbound.put_entries(store.take_outbox())
+            scheduler.sleep_until_next()
+
+
+def run_backfill(registry, store):
+    """Догружает историю работ всех студентов перед началом опроса.
+
+    Для новых студентов история читается с from_date=0 без уведомлений,
+    для известных — с сохраненной метки, с уведомлениями о новых работах.
+    """
+    bot = telebot.TeleBot(token=TELEGRAM_TOKEN)
+    send = TelegramSender(bot, logger=logger)
+    with build_client() as client, \
+            OutboundQueue(send, on_done=store.acknowledge,
+                          on_failed=store.return_entry,
+                          logger=logger) as outbound:
+        for tenant in registry:
+            known = store.load(tenant.token) is not None
+            from_date = tenant.timestamp if known else 0
+            try:
+                stream = client.stream_homeworks(tenant.token, from_date)
+                for message in backfill(stream, store, tenant,
+                                        announce_new=known):
+                    store.enqueue(tenant.chat_id, message)
+            except Exception as error:
+                logger.error(f'Ошибка загрузки истории {tenant!r}: {error}')
+            store.flush()
+            outbound.put_entries(store.take_outbox())
+
+
+ENGINES = {
+    'sequential': run_sequential,
+    'asyncio': run_asyncio,
+    'threads': run_threads,
+}
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(
+        description='Бот статусов домашних работ для многих студентов.')
+    parser.add_argument('--tenants', default=TENANTS_FILE,
+                        help='файл с парами «токен чат»')
+    parser.add_argument('--state', default=STATE_DB or 'state.db',
+                        help='файл SQLite с состоянием опроса')
+    parser.add_argument('--backfill', action='store_true',
+                        help='перед опросом догрузить историю работ')
+    parser.add_argument('--engine', choices=ENGINES, default='sequential',
+                        help='способ опроса API')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Запускает опрос всех студентов из реестра."""
+    args = parse_args(argv)
+    setup_logging()
+    if not TELEGRAM_TOKEN:
+        logger.critical('Ошибка работы программы: '
+                        'нет переменной окружения TELEGRAM_TOKEN. '
+                        'Программа остановлена.')
+        sys.exit('error')
+    registry = TenantRegistry.from_file(args.tenants)
+    bind_stats(dedupe_stats, registry.dedupe.stats)
+    start_metrics()
+    store = StateStore(args.state)
+    for tenant in registry:
+        store.restore(tenant)
+    logger.debug(f'Бот запущен для {len(registry)} студентов')
+    try:
+        if args.backfill:
+            run_backfill(registry, store)
+        ENGINES[args.engine](registry, store)
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
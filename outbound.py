@@ -0,0 +1,355 @@
+from collections import namedtuple
+import heapq
+from itertools import count
+import os
+import queue
+import threading
+import time
+
+from digest import DIGEST_WINDOW, build_digests
+from exceptions import RetryAfter
+from metrics import (bind_stats, count_error, outbound_stats,
+                     send_queue_depth, send_seconds)
+from state_store import OutboxEntry
+
+
+QUEUE_SIZE = 1000
+SEND_WORKERS = int(os.getenv('SEND_WORKERS', 2))
+SEND_OVERFLOW = os.getenv('SEND_OVERFLOW', 'block')
+BLOCK_TIMEOUT = 5
+
+BLOCK = 'block'
+DROP_NEWEST = 'drop_newest'
+DROP_OLDEST = 'drop_oldest'
+OVERFLOW_POLICIES = (BLOCK, DROP_NEWEST, DROP_OLDEST)
+
+OutboundMessage = namedtuple('OutboundMessage',
+                             ('chat_id', 'text', 'enqueued', 'entry_id'))
+DigestDue = namedtuple('DigestDue', ('chat_id', 'messages'))
+QueueStats = namedtuple('QueueStats', (
+    'depth', 'max_depth', 'enqueued', 'sent', 'failed', 'dropped',
+    'deferred', 'coalesced', 'avg_latency', 'max_latency'))
+
+_STOP = object()
+
+
+def outbox_entries(message):
+    """Возвращает уведомления outbox, вошедшие в сообщение очереди.
+
+    У частей дайджеста в entry_id лежат сами записи OutboxEntry.
+    """
+    if type(message.entry_id) is tuple:
+        return message.entry_id
+    if message.entry_id is None:
+        return ()
+    return (OutboxEntry(message.entry_id, message.chat_id, message.text),)
+
+
+class OutboundQueue:
+    """Ограниченная очередь исходящих сообщений с потоками отправки.
+
+    Опрос кладет сообщения в очередь и сразу продолжает работу, а потоки
+    отправки вызывают send(chat_id, text). При заполнении очереди политика
+    block задерживает опрос (не дольше block_timeout, потом сообщение
+    отбрасывается), drop_newest отбрасывает новое сообщение,
+    drop_oldest — самое старое из ожидающих. Если send выбрасывает
+    RetryAfter, сообщение не теряется: оно откладывается на retry_after
+    и возвращается в очередь отдельным потоком. После ответа Telegram
+    (успешного или окончательного отказа) вызывается on_done(entry_id),
+    чтобы outbox забыл уведомление. Уведомление, которое не удалось
+    отправить из-за сбоя или отбросила политика переполнения, отдается
+    on_failed(entry) записью OutboxEntry, чтобы outbox выдал его снова.
+
+    При window > 0 сообщения чата копятся window секунд с первого
+    и уходят одним дайджестом (см. build_digests); entry_id всех вошедших
+    сообщений подтверждаются или возвращаются с последней частью
+    дайджеста. Копящиеся
+    сообщения занимают место в очереди наравне с ожидающими отправки,
+    и политика переполнения применяется к ним при постановке; сама
+    очередь тогда не ограничена, чтобы выпуск дайджеста не блокировался.
+    """
+
+    def __init__(self, send, maxsize=QUEUE_SIZE, workers=SEND_WORKERS,
+                 overflow=SEND_OVERFLOW, block_timeout=BLOCK_TIMEOUT,
+                 window=DIGEST_WINDOW, on_done=None, on_failed=None,
+                 logger=None, clock=time.monotonic):
+        """Создает очередь; потоки отправки запускаются в start()."""
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'Неизвестная политика переполнения {overflow}, '
+                             f'ожидается одна из {OVERFLOW_POLICIES}')
+        self.send = send
+        self.maxsize = maxsize
+        self.queue = queue.Queue(0 if window > 0 else maxsize)
+        self.workers = workers
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.window = window
+        self.on_done = on_done
+        self.on_failed = on_failed
+        self.logger = logger
+        self.clock = clock
+        self._threads = []
+        self._lock = threading.Lock()
+        self._delayed = []
+        self._sequence = count()
+        self._delayed_changed = threading.Condition()
+        self._digests = {}
+        self._collecting = 0
+        self._collected = 0
+        self._stopping = False
+        self._max_depth = self._enqueued = self._sent = 0
+        self._failed = self._dropped = self._deferred = self._coalesced = 0
+        self._total_latency = self._max_latency = 0
+
+    def start(self):
+        """Запускает потоки отправки и возврата отложенных сообщений."""
+        if self._threads:
+            return self
+        self._stopping = False
+        self._releaser = threading.Thread(target=self._release, daemon=True,
+                                          name='sender-retry')
+        self._releaser.start()
+        send_queue_depth.set_function(self.queue.qsize)
+        bind_stats(outbound_stats, self.stats)
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True,
+                                      name=f'sender-{number}')
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def put(self, chat_id, text, entry_id=None):
+        """Ставит сообщение в очередь; возвращает False, если отброшено."""
+        message = OutboundMessage(chat_id, text, self.clock(), entry_id)
+        if self.window > 0:
+            if not self._collect(message):
+                self._drop('новое', message)
+                return False
+            with self._lock:
+                self._enqueued += 1
+            return True
+        try:
+            if self.overflow == BLOCK:
+                self.queue.put(message, timeout=self.block_timeout)
+            else:
+                self._put_nowait(message)
+        except queue.Full:
+            self._drop('новое', message)
+            return False
+        with self._lock:
+            self._enqueued += 1
+            self._max_depth = max(self._max_depth, self.queue.qsize())
+        return True
+
+    def put_entries(self, entries):
+        """Ставит в очередь уведомления из outbox хранилища."""
+        for entry in entries:
+            self.put(entry.chat_id, entry.text, entry.id)
+
+    def _has_room(self):
+        return (self.maxsize <= 0
+                or self.queue.qsize() + self._collected < self.maxsize)
+
+    def _make_room(self):
+        """Освобождает место по политике переполнения; lock уже взят."""
+        if self.overflow == BLOCK:
+            return self._delayed_changed.wait_for(self._has_room,
+                                                  self.block_timeout)
+        if self._has_room():
+            return True
+        if self.overflow != DROP_OLDEST:
+            return False
+        for messages in self._digests.values():
+            if messages:
+                oldest = messages.pop(0)
+                self._collected -= 1
+                break
+        else:
+            try:
+                oldest = self.queue.get_nowait()
+            except queue.Empty:
+                return self._has_room()
+            self.queue.task_done()
+        self._drop('самое старое', oldest)
+        return True
+
+    def _collect(self, message):
+        with self._delayed_changed:
+            if not self._make_room():
+                return False
+            self._collected += 1
+            messages = self._digests.get(message.chat_id)
+            if messages is None:
+                messages = self._digests[message.chat_id] = []
+                heapq.heappush(self._delayed, (
+                    message.enqueued + self.window, next(self._sequence),
+                    DigestDue(message.chat_id, messages)))
+                self._delayed_changed.notify_all()
+            messages.append(message)
+        return True
+
+    def _put_digest(self, chat_id, messages):
+        if not messages:
+            return
+        texts = build_digests([message.text for message in messages])
+        entries = tuple(entry for message in messages
+                        for entry in outbox_entries(message))
+        for number, text in enumerate(texts, start=1):
+            self.queue.put(OutboundMessage(
+                chat_id, text, messages[0].enqueued,
+                entries if number == len(texts) else ()))
+        with self._lock:
+            self._coalesced += len(messages) - len(texts)
+            self._max_depth = max(self._max_depth, self.queue.qsize())
+
+    def _put_nowait(self, message):
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except queue.Full:
+                if self.overflow != DROP_OLDEST:
+                    raise
+            try:
+                oldest = self.queue.get_nowait()
+            except queue.Empty:
+                continue
+            self.queue.task_done()
+            self._drop('самое старое', oldest)
+
+    def _drop(self, which, message):
+        with self._lock:
+            self._dropped += 1
+        if self.logger:
+            self.logger.warning(f'Очередь отправки переполнена, '
+                                f'отброшено {which} сообщение')
+        self._return(message)
+
+    def _return(self, message):
+        if self.on_failed:
+            for entry in outbox_entries(message):
+                self.on_failed(entry)
+
+    def _work(self):
+        while True:
+            message = self.queue.get()
+            if self.window > 0:
+                with self._delayed_changed:
+                    self._delayed_changed.notify_all()
+            if message is _STOP:
+                self.queue.task_done()
+                return
+            if self._deliver(message):
+                self.queue.task_done()
+
+    def _deliver(self, message):
+        """Отправляет сообщение; возвращает False, если оно отложено."""
+        started = time.perf_counter()
+        try:
+            delivered = self.send(message.chat_id, message.text) is not False
+        except RetryAfter as error:
+            self._defer(message, error.retry_after)
+            return False
+        except Exception as error:
+            count_error(error)
+            delivered = False
+            if self.logger:
+                self.logger.error(f'Ошибка отправки сообщения: {error}')
+            self._return(message)
+        else:
+            if self.on_done:
+                for entry in outbox_entries(message):
+                    self.on_done(entry.id)
+        send_seconds.observe(time.perf_counter() - started)
+        latency = self.clock() - message.enqueued
+        with self._lock:
+            if delivered:
+                self._sent += 1
+            else:
+                self._failed += 1
+            self._total_latency += latency
+            self._max_latency = max(self._max_latency, latency)
+        return True
+
+    def _defer(self, message, delay):
+        with self._delayed_changed:
+            heapq.heappush(self._delayed, (self.clock() + delay,
+                                           next(self._sequence), message))
+            self._delayed_changed.notify_all()
+        with self._lock:
+            self._deferred += 1
+
+    def _next_due(self):
+        with self._delayed_changed:
+            while True:
+                if not self._delayed:
+                    if self._stopping:
+                        return _STOP
+                    self._delayed_changed.wait()
+                    continue
+                due, _, item = self._delayed[0]
+                wait = due - self.clock()
+                if wait > 0:
+                    self._delayed_changed.wait(wait)
+                    continue
+                heapq.heappop(self._delayed)
+                if type(item) is DigestDue:
+                    del self._digests[item.chat_id]
+                    self._collecting += 1
+                return item
+
+    def _release(self):
+        while True:
+            item = self._next_due()
+            if item is _STOP:
+                return
+            if type(item) is DigestDue:
+                self._put_digest(*item)
+                with self._delayed_changed:
+                    self._collected -= len(item.messages)
+                    self._collecting -= 1
+                    self._delayed_changed.notify_all()
+                continue
+            # Отложенное сообщение еще числится незавершенным в очереди:
+            # задача закрывается только после возврата сообщения в нее.
+            self.queue.put(item)
+            self.queue.task_done()
+
+    def join(self):
+        """Ждет отправки всех сообщений, поставленных в очередь."""
+        with self._delayed_changed:
+            while self._digests or self._collecting:
+                self._delayed_changed.wait()
+        self.queue.join()
+
+    def stop(self, timeout=None):
+        """Отправляет оставшиеся сообщения и останавливает потоки."""
+        if not self._threads:
+            return
+        self.join()
+        with self._delayed_changed:
+            self._stopping = True
+            self._delayed_changed.notify_all()
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in (*self._threads, self._releaser):
+            thread.join(timeout)
+        self._threads.clear()
+
+    def stats(self):
+        """Возвращает глубину очереди, счетчики и задержку отправки."""
+        with self._lock:
+            done = self._sent + self._failed
+            return QueueStats(
+                self.queue.qsize(), self._max_depth, self._enqueued,
+                self._sent, self._failed, self._dropped, self._deferred,
+                self._coalesced, self._total_latency / done if done else 0,
+                self._max_latency)
+
+    def __enter__(self):
+        """Запускает потоки отправки."""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Дожидается отправки и останавливает потоки."""
+        self.stop()
@@ -0,0 +1,133 @@
+import asyncio
+from collections import namedtuple
+import threading
+import time
+
+
+GLOBAL_RATE = 20
+GLOBAL_BURST = 40
+TOKEN_RATE = 0.2
+TOKEN_BURST = 2
+
+RateLimiterStats = namedtuple(
+    'RateLimiterStats', ('acquired', 'delayed', 'total_wait', 'max_wait'))
+
+
+class TokenBucket:
+    """Корзина токенов, пополняемая с постоянной скоростью."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity, now):
+        """Создает полную корзину."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def reserve(self, now, amount=1):
+        """Резервирует токены и возвращает время ожидания до их появления.
+
+        Баланс может уйти в минус: следующий вызов учтет уже
+        зарезервированные токены и получит более долгое ожидание.
+        """
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0
+        return -self.tokens / self.rate
+
+    def wait_time(self, now):
+        """Возвращает время до появления токена, ничего не резервируя."""
+        tokens = min(self.capacity,
+                     self.tokens + (now - self.updated) * self.rate)
+        return 0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def pause(self, now, seconds):
+        """Откладывает появление следующего токена на seconds."""
+        self.tokens = min(self.tokens + (now - self.updated) * self.rate,
+                          1 - seconds * self.rate)
+        self.updated = now
+
+
+class RateLimiter:
+    """Ограничитель запросов к API: общая корзина и корзина на токен."""
+
+    def __init__(self, global_rate=GLOBAL_RATE, global_burst=GLOBAL_BURST,
+                 token_rate=TOKEN_RATE, token_burst=TOKEN_BURST,
+                 clock=time.monotonic):
+        """Создает общую корзину; корзины токенов создаются по мере нужды."""
+        self.clock = clock
+        self.token_rate = token_rate
+        self.token_burst = token_burst
+        self.global_bucket = TokenBucket(global_rate, global_burst, clock())
+        self.buckets = {}
+        self._lock = threading.Lock()
+        self._acquired = self._delayed = 0
+        self._total_wait = self._max_wait = 0
+
+    def _bucket(self, token, now):
+        bucket = self.buckets.get(token)
+        if bucket is None:
+            bucket = self.buckets[token] = TokenBucket(
+                self.token_rate, self.token_burst, now)
+        return bucket
+
+    def wait_time(self, token):
+        """Возвращает ожидание по корзине токена, ничего не резервируя."""
+        with self._lock:
+            now = self.clock()
+            return self._bucket(token, now).wait_time(now)
+
+    def pause(self, token, seconds):
+        """Запрещает запросы для токена на seconds, например после 429."""
+        with self._lock:
+            now = self.clock()
+            self._bucket(token, now).pause(now, seconds)
+
+    def reserve(self, token):
+        """Резервирует запрос для токена и возвращает время ожидания."""
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(token, now)
+            wait = max(self.global_bucket.reserve(now), bucket.reserve(now))
+            self._acquired += 1
+            if wait:
+                self._delayed += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+        return wait
+
+    def acquire(self, token):
+        """Блокирует поток, пока запрос для токена не будет разрешен."""
+        wait = self.reserve(token)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self, token):
+        """Резервирует запрос, только если его можно сделать сразу."""
+        with self._lock:
+            now = self.clock()
+            bucket = self._bucket(token, now)
+            if self.global_bucket.wait_time(now) or bucket.wait_time(now):
+                return False
+            self.global_bucket.reserve(now)
+            bucket.reserve(now)
+            self._acquired += 1
+            return True
+
+    async def acquire_async(self, token):
+        """Откладывает корутину, пока запрос для токена не будет разрешен."""
+        wait = self.reserve(token)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self):
+        """Возвращает число запросов, отложенных запросов и время ожидания."""
+        with self._lock:
+            return RateLimiterStats(self._acquired, self._delayed,
+                                    self._total_wait, self._max_wait)
@@ -0,0 +1,189 @@
+import asyncio
+from collections import Counter, deque, namedtuple
+from http import HTTPStatus
+import random
+import threading
+import time
+
+import requests
+
+from exceptions import IncorrectAPIRequest, IncorrectStatusRequest
+
+
+ATTEMPTS = 3
+BASE_DELAY = 1
+MAX_DELAY = 8
+RETRY_RATIO = 0.2
+RESERVE_RATE = 0.1
+BUDGET_CAPACITY = 10
+HISTORY_SIZE = 1000
+
+RETRYABLE_STATUSES = frozenset((
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+))
+FATAL_REQUEST_ERRORS = (
+    requests.exceptions.InvalidURL,
+    requests.exceptions.InvalidSchema,
+    requests.exceptions.MissingSchema,
+    requests.exceptions.InvalidHeader,
+    requests.exceptions.TooManyRedirects,
+)
+
+SUCCESS = 'success'
+RETRY = 'retry'
+FATAL = 'fatal'
+EXHAUSTED = 'exhausted'
+DEADLINE = 'deadline'
+NO_BUDGET = 'no_budget'
+
+AttemptRecord = namedtuple(
+    'AttemptRecord', ('attempt', 'outcome', 'error', 'delay'))
+
+
+def is_transient(error):
+    """Проверяет, может ли повтор запроса завершиться успешно."""
+    if isinstance(error, IncorrectStatusRequest):
+        return error.status_code in RETRYABLE_STATUSES
+    if isinstance(error, IncorrectAPIRequest):
+        return not isinstance(error.__cause__, FATAL_REQUEST_ERRORS)
+    return False
+
+
+class RetryBudget:
+    """Общий бюджет повторов, не дающий им умножить нагрузку при сбое.
+
+    Каждый первый запрос пополняет бюджет на RETRY_RATIO, каждый повтор
+    тратит единицу. Небольшой запас восстанавливается со временем, чтобы
+    редкие запросы тоже могли повторяться.
+    """
+
+    def __init__(self, ratio=RETRY_RATIO, reserve_rate=RESERVE_RATE,
+                 capacity=BUDGET_CAPACITY, clock=time.monotonic):
+        """Создает полный бюджет."""
+        self.ratio = ratio
+        self.reserve_rate = reserve_rate
+        self.capacity = capacity
+        self.clock = clock
+        self.balance = capacity
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        """Пополняет бюджет за первый запрос."""
+        with self._lock:
+            self.balance = min(self.capacity, self.balance + self.ratio)
+
+    def withdraw(self):
+        """Списывает один повтор, если бюджет позволяет."""
+        with self._lock:
+            now = self.clock()
+            self.balance = min(
+                self.capacity,
+                self.balance + (now - self.updated) * self.reserve_rate)
+            self.updated = now
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+class Retrier:
+    """Повторяет временно неудачные запросы с экспоненциальной паузой.
+
+    Если задан deadline, он ограничивает вызов целиком, вместе со всеми
+    попытками и паузами: повтор, который начался бы позже срока,
+    не делается.
+    """
+
+    def __init__(self, attempts=ATTEMPTS, base_delay=BASE_DELAY,
+                 max_delay=MAX_DELAY, budget=None, logger=None, rng=None,
+                 deadline=None, clock=time.monotonic):
+        """Задает число попыток, границы паузы, бюджет повторов и срок."""
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.logger = logger
+        self.rng = rng or random.Random()
+        self.deadline = deadline
+        self.clock = clock
+        self.outcomes = Counter()
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self._lock = threading.Lock()
+
+    def delay(self, attempt):
+        """Возвращает паузу перед повтором с полным случайным разбросом."""
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return self.rng.uniform(0, cap)
+
+    def _record(self, attempt, outcome, error=None, delay=0):
+        with self._lock:
+            self.outcomes[outcome] += 1
+        self.history.append(AttemptRecord(
+            attempt, outcome, type(error).__name__ if error else None, delay))
+        if self.logger and outcome != SUCCESS:
+            self.logger.warning(
+                f'Попытка {attempt} запроса к API: {outcome}, {error}')
+
+    def _until(self):
+        if self.deadline is None:
+            return None
+        return self.clock() + self.deadline
+
+    def _next_delay(self, attempt, error, until):
+        """Возвращает паузу перед повтором или None, если повтора не будет."""
+        if not is_transient(error):
+            outcome = FATAL
+        elif attempt >= self.attempts:
+            outcome = EXHAUSTED
+        else:
+            delay = self.delay(attempt)
+            if until is not None and self.clock() + delay >= until:
+                outcome = DEADLINE
+            elif not self.budget.withdraw():
+                outcome = NO_BUDGET
+            else:
+                self._record(attempt, RETRY, error, delay)
+                return delay
+        self._record(attempt, outcome, error)
+        return None
+
+    def call(self, func, *args, **kwargs):
+        """Вызывает функцию, повторяя временные сбои до срока."""
+        self.budget.deposit()
+        until = self._until()
+        attempt = 1
+        while True:
+            try:
+                result = func(*args, **kwargs)
+            except Exception as error:
+                delay = self._next_delay(attempt, error, until)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            else:
+                self._record(attempt, SUCCESS)
+                return result
+
+    async def call_async(self, func, *args, **kwargs):
+        """Вызывает корутинную функцию, повторяя временные сбои до срока."""
+        self.budget.deposit()
+        until = self._until()
+        attempt = 1
+        while True:
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as error:
+                delay = self._next_delay(attempt, error, until)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                self._record(attempt, SUCCESS)
+                return result
@@ -0,0 +1,120 @@
+from collections import namedtuple
+import heapq
+import itertools
+import random
+import time
+
+from constants import RETRY_PERIOD
+
+
+STATUS_INTERVALS = {
+    'reviewing': RETRY_PERIOD // 4,
+    'rejected': RETRY_PERIOD,
+    'approved': RETRY_PERIOD * 3,
+}
+IDLE_INTERVAL = RETRY_PERIOD * 3
+JITTER = 0.1
+
+PollDecision = namedtuple('PollDecision', ('interval', 'next_poll', 'status'))
+
+
+class AdaptivePolicy:
+    """Подбирает интервал следующего опроса по последнему статусу работы.
+
+    Работы на проверке опрашиваются чаще, принятые и неизвестные — реже,
+    а студенты без единой работы (last_status is None) — реже всех.
+    Случайный разброс не дает студентам синхронизироваться.
+    """
+
+    def __init__(self, intervals=None, default=RETRY_PERIOD,
+                 idle=IDLE_INTERVAL, jitter=JITTER, rng=None):
+        """Задает интервалы по статусам и долю случайного разброса."""
+        self.intervals = STATUS_INTERVALS if intervals is None else intervals
+        self.default = default
+        self.idle = idle
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+
+    def interval(self, status):
+        """Возвращает интервал опроса для статуса с разбросом."""
+        if status is None:
+            base = self.idle
+        else:
+            base = self.intervals.get(status, self.default)
+        return base * (1 + self.rng.uniform(-self.jitter, self.jitter))
+
+    def decide(self, tenant, now=None):
+        """Назначает студенту время следующего опроса."""
+        now = time.time() if now is None else now
+        interval = self.interval(tenant.last_status)
+        tenant.next_poll = now + interval
+        return PollDecision(interval, tenant.next_poll, tenant.last_status)
+
+    def stagger(self, tenants, now=None):
+        """Разносит первые опросы студентов случайно по одному интервалу.
+
+        Без этого после запуска все студенты созревают в один момент
+        и опрашиваются одной пачкой.
+        """
+        now = time.time() if now is None else now
+        for tenant in tenants:
+            tenant.next_poll = now + self.rng.uniform(0, self.default)
+
+
+class DeadlineScheduler:
+    """Очередь студентов по времени следующего опроса на двоичной куче.
+
+    Постановка студента стоит O(log n), выдача каждого созревшего — тоже
+    O(log n). Перепланированный студент остается в куче устаревшей записью,
+    которая отбрасывается при извлечении по несовпадению с next_poll.
+    """
+
+    def __init__(self, tenants=()):
+        """Ставит в очередь студентов по их текущему next_poll."""
+        self._heap = []
+        self._counter = itertools.count()
+        self.push_all(tenants)
+
+    def push(self, tenant):
+        """Ставит студента в очередь на момент tenant.next_poll."""
+        heapq.heappush(
+            self._heap, (tenant.next_poll, next(self._counter), tenant))
+
+    def push_all(self, tenants):
+        """Ставит в очередь нескольких студентов."""
+        for tenant in tenants:
+            self.push(tenant)
+
+    def pop_due(self, now=None):
+        """Извлекает всех студентов, срок опроса которых наступил."""
+        now = time.time() if now is None else now
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now:
+            deadline, _, tenant = heapq.heappop(heap)
+            if deadline == tenant.next_poll:
+                due.append(tenant)
+        return due
+
+    def next_deadline(self):
+        """Возвращает ближайший срок опроса или None для пустой очереди."""
+        heap = self._heap
+        while heap and heap[0][0] != heap[0][2].next_poll:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def seconds_until_next(self, now=None):
+        """Возвращает время до ближайшего срока опроса."""
+        now = time.time() if now is None else now
+        deadline = self.next_deadline()
+        if deadline is None:
+            return RETRY_PERIOD
+        return max(0, deadline - now)
+
+    def sleep_until_next(self):
+        """Спит ровно до ближайшего срока опроса."""
+        time.sleep(self.seconds_until_next())
+
+    def __len__(self):
+        """Возвращает число записей в куче, включая устаревшие."""
+        return len(self._heap)
@@ -0,0 +1,193 @@
+from collections import deque, namedtuple
+import sqlite3
+import time
+
+
+BATCH_SIZE = 100
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tenants (
+    token TEXT PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    last_message TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS homework_statuses (
+    token TEXT NOT NULL,
+    homework_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (token, homework_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    chat_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created REAL NOT NULL
+);
+'''
+
+StatusEvent = namedtuple('StatusEvent', ('homework', 'previous'))
+OutboxEntry = namedtuple('OutboxEntry', ('id', 'chat_id', 'text'))
+
+
+def homework_key(homework):
+    """Возвращает идентификатор работы для хранения ее статуса."""
+    return str(homework.get('id', homework.get('homework_name')))
+
+
+def homework_identity(homework):
+    """Возвращает идентификатор и статус работы (словаря или записи)."""
+    if isinstance(homework, dict):
+        return homework_key(homework), homework.get('status')
+    return homework.key, homework.status
+
+
+class StateStore:
+    """Состояние опроса в SQLite: метки времени и статусы работ.
+
+    База открывается в режиме WAL, записи копятся в памяти и фиксируются
+    одной транзакцией по вызову flush() или maybe_flush(), когда
+    накопилось BATCH_SIZE изменений. Сами save() и new_homeworks()
+    ничего не фиксируют: вызывающий код сначала пишет уведомления
+    в outbox и только потом фиксирует их вместе со статусами.
+    При запуске ничего не загружается целиком: состояние студента и статус
+    работы читаются по первичному ключу, когда понадобятся.
+
+    Уведомления пишутся в outbox той же транзакцией, что и статусы,
+    поэтому после сбоя не бывает запомненного статуса без уведомления.
+    Отправленные уведомления удаляются из outbox при следующей фиксации;
+    неотправленные выдаются take_outbox() снова после перезапуска.
+    Фиксация ждет записи на диск (synchronous=FULL), но одна на пачку.
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        """Открывает базу и создает таблицы при необходимости."""
+        self.connection = sqlite3.connect(str(path))
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=FULL')
+        self.connection.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self._tenants = {}
+        self._statuses = {}
+        self._notifications = []
+        self._acknowledged = deque()
+        self._committed = deque(OutboxEntry(*row) for row in
+                                self.connection.execute(
+                                    'SELECT id, chat_id, text FROM outbox '
+                                    'ORDER BY id'))
+
+    def load(self, token):
+        """Возвращает сохраненные метку времени и последнее сообщение."""
+        if token in self._tenants:
+            return self._tenants[token]
+        row = self.connection.execute(
+            'SELECT timestamp, last_message FROM tenants WHERE token = ?',
+            (token,)).fetchone()
+        return tuple(row) if row else None
+
+    def save(self, token, timestamp, last_message):
+        """Запоминает метку времени и последнее сообщение студента."""
+        self._tenants[token] = (timestamp, last_message)
+
+    def restore(self, tenant):
+        """Восстанавливает состояние студента из базы, если оно есть."""
+        saved = self.load(tenant.token)
+        if saved:
+            tenant.timestamp, tenant.last_message = saved
+        return tenant
+
+    def save_tenant(self, tenant):
+        """Запоминает состояние студента."""
+        self.save(tenant.token, tenant.timestamp, tenant.last_message)
+
+    def status(self, token, homework_id):
+        """Возвращает последний известный статус работы или None."""
+        key = (token, homework_id)
+        if key in self._statuses:
+            return self._statuses[key]
+        row = self.connection.execute(
+            'SELECT status FROM homework_statuses '
+            'WHERE token = ? AND homework_id = ?', key).fetchone()
+        return row[0] if row else None
+
+    def transitions(self, token, homeworks):
+        """Выдает события StatusEvent для работ, сменивших статус.
+
+        Новые статусы запоминаются до следующей фиксации.
+        """
+        for homework in homeworks:
+            homework_id, status = homework_identity(homework)
+            previous = self.status(token, homework_id)
+            if previous != status:
+                self._statuses[(token, homework_id)] = status
+                yield StatusEvent(homework, previous)
+
+    def new_homeworks(self, token, homeworks):
+        """Отбирает работы со сменившимся статусом и запоминает статусы."""
+        return [homework for homework, _ in
+                self.transitions(token, homeworks)]
+
+    def enqueue(self, chat_id, text):
+        """Добавляет уведомление в outbox до следующей фиксации."""
+        self._notifications.append((chat_id, text))
+
+    def acknowledge(self, entry_id):
+        """Отмечает уведомление отправленным; можно из любого потока."""
+        if entry_id is not None:
+            self._acknowledged.append(entry_id)
+
+    def take_outbox(self):
+        """Выдает зафиксированные, но еще не выданные уведомления."""
+        while self._committed:
+            yield self._committed.popleft()
+
+    def return_entry(self, entry):
+        """Возвращает невыданное уведомление в начало очереди outbox."""
+        self._committed.appendleft(entry)
+
+    def maybe_flush(self):
+        """Фиксирует изменения, если их накопилось batch_size.
+
+        Вызывается, когда уведомления студента уже записаны в outbox.
+        """
+        if (len(self._tenants) + len(self._statuses)
+                + len(self._notifications) >= self.batch_size):
+            self.flush()
+
+    def _write_outbox(self):
+        now = time.time()
+        entries = []
+        for chat_id, text in self._notifications:
+            cursor = self.connection.execute(
+                'INSERT INTO outbox (chat_id, text, created) '
+                'VALUES (?, ?, ?)', (chat_id, text, now))
+            entries.append(OutboxEntry(cursor.lastrowid, chat_id, text))
+        acknowledged = [self._acknowledged.popleft()
+                        for _ in range(len(self._acknowledged))]
+        self.connection.executemany('DELETE FROM outbox WHERE id = ?',
+                                    ((entry_id,) for entry_id in acknowledged))
+        return entries
+
+    def flush(self):
+        """Фиксирует накопленные изменения одной транзакцией."""
+        if not (self._tenants or self._statuses or self._notifications
+                or self._acknowledged):
+            return
+        with self.connection:
+            entries = self._write_outbox()
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO tenants '
+                '(token, timestamp, last_message) VALUES (?, ?, ?)',
+                ((token, *state) for token, state in self._tenants.items()))
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO homework_statuses '
+                '(token, homework_id, status) VALUES (?, ?, ?)',
+                ((*key, status) for key, status in self._statuses.items()))
+        self._committed.extend(entries)
+        self._tenants.clear()
+        self._statuses.clear()
+        self._notifications.clear()
+
+    def close(self):
+        """Фиксирует изменения и закрывает базу."""
+        self.flush()
+        self.connection.close()
@@ -0,0 +1,133 @@
+import codecs
+import json
+
+from exceptions import IncorrectKeyCurrentDate
+
+
+STREAM_CHUNK = 64 * 1024
+WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+class StreamingAnswer:
+    """Потоковый разбор ответа API: работы выдаются по одной.
+
+    Тело читается порциями, в памяти держатся только текущая порция
+    и разбираемая работа. Типы ключей homeworks и current_date проверяются
+    по мере чтения; current_date доступна после перебора всех работ.
+    """
+
+    def __init__(self, chunks, close=None):
+        """Запоминает источник порций тела ответа (bytes или str)."""
+        self._chunks = iter(chunks)
+        self._close = close
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self.current_date = None
+
+    def _fill(self):
+        """Дочитывает порцию тела; возвращает False в конце потока."""
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._utf8.decode(b'', final=True)
+        elif isinstance(chunk, bytes):
+            text = self._utf8.decode(chunk)
+        else:
+            text = chunk
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """Возвращает первый непробельный символ, не сдвигая позицию."""
+        while True:
+            while (self._pos < len(self._buffer)
+                   and self._buffer[self._pos] in WHITESPACE):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError('Ответ API оборван')
+
+    def _expect(self, chars):
+        """Считывает один из ожидаемых символов разметки."""
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(f'Ответ API не является допустимым JSON: '
+                             f'ожидался один из {chars!r}, получен {char!r}')
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """Разбирает одно значение JSON, дочитывая поток при нехватке."""
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _homeworks(self):
+        if self._peek() != '[':
+            raise TypeError('Неверный тип данных по ключу homeworks, '
+                            f'получен {type(self._value())}')
+        self._pos += 1
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(',]') == ']':
+                return
+
+    def _current_date(self):
+        self.current_date = self._value()
+        if not isinstance(self.current_date, int):
+            raise IncorrectKeyCurrentDate(
+                'Неверный тип данных по current_date, '
+                f'получен тип {type(self.current_date)}')
+
+    def _members(self, seen):
+        if self._peek() != '{':
+            raise TypeError('Неверный тип данных ответа, '
+                            f'получен {type(self._value())}')
+        self._pos += 1
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            seen.add(key)
+            if key == 'homeworks':
+                yield from self._homeworks()
+            elif key == 'current_date':
+                self._current_date()
+            else:
+                self._value()
+            if self._expect(',}') == '}':
+                return
+
+    def __iter__(self):
+        """Перебирает работы ответа по мере чтения тела."""
+        seen = set()
+        try:
+            yield from self._members(seen)
+            if 'homeworks' not in seen:
+                raise KeyError('В ответе API отсутствует ключ homeworks')
+            if 'current_date' not in seen:
+                raise KeyError('В ответе API отсутствует ключ current_date')
+        finally:
+            if self._close:
+                self._close()
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+from telebot.apihelper import ApiException
+
+from exceptions import RetryAfter
+from metrics import count_error
+from ratelimit import RateLimiter
+
+
+TELEGRAM_GLOBAL_RATE = 30
+TELEGRAM_CHAT_RATE = 1
+DEFAULT_RETRY_AFTER = 1
+SERVER_RETRY_AFTER = 5
+DEFER_AFTER = 0.05
+
+
+def telegram_limiter():
+    """Создает ограничитель под лимиты Telegram: общий и на чат."""
+    return RateLimiter(global_rate=TELEGRAM_GLOBAL_RATE,
+                       global_burst=TELEGRAM_GLOBAL_RATE,
+                       token_rate=TELEGRAM_CHAT_RATE, token_burst=1)
+
+
+def error_status(error):
+    """Возвращает HTTP-код ошибки Telegram из JSON или из самого ответа."""
+    status = getattr(error, 'error_code', None)
+    if status is None:
+        result = getattr(error, 'result', None)
+        status = getattr(result, 'status_code', None)
+        if status is None:
+            status = getattr(result, 'status', None)
+    return status
+
+
+def retry_after(error):
+    """Возвращает задержку повтора отправки или None, если повтор не нужен.
+
+    Ответ 429 повторяется через свой retry_after, ошибки сервера 5xx,
+    в том числе без JSON в ответе (ApiHTTPException), — через
+    SERVER_RETRY_AFTER. Остальные ошибки окончательные.
+    """
+    status = error_status(error)
+    if status == HTTPStatus.TOO_MANY_REQUESTS:
+        parameters = (getattr(error, 'result_json', None) or {}).get(
+            'parameters') or {}
+        return parameters.get('retry_after', DEFAULT_RETRY_AFTER)
+    if status is not None and status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        return SERVER_RETRY_AFTER
+    return None
+
+
+class TelegramSender:
+    """Отправка в Telegram с учетом общего лимита и лимита на чат.
+
+    Используется как send для OutboundQueue. Если чат исчерпал свой
+    лимит, сообщение не ждет в потоке отправки, а возвращается в очередь
+    через RetryAfter, и поток берется за другие чаты; ожидание по общему
+    лимиту короткое и выдерживается на месте. Ответ 429 или ошибка
+    сервера 5xx приостанавливает чат на срок из retry_after(),
+    а сообщение откладывается на тот же срок.
+    """
+
+    def __init__(self, bot, limiter=None, defer_after=DEFER_AFTER,
+                 logger=None):
+        """Запоминает бота и ограничитель с ключом по chat_id."""
+        self.bot = bot
+        self.limiter = limiter or telegram_limiter()
+        self.defer_after = defer_after
+        self.logger = logger
+
+    def __call__(self, chat_id, text):
+        """Отправляет сообщение; возвращает False при неустранимой ошибке."""
+        wait = self.limiter.wait_time(chat_id)
+        if wait > self.defer_after:
+            raise RetryAfter(wait)
+        self.limiter.acquire(chat_id)
+        try:
+            self.bot.send_message(chat_id, text)
+        except ApiException as error:
+            return self.failed(chat_id, error)
+        return self.sent()
+
+    def sent(self):
+        """Отмечает успешную отправку."""
+        if self.logger:
+            self.logger.debug('Отправлено сообщение')
+        return True
+
+    def failed(self, chat_id, error):
+        """Разбирает ошибку Telegram: False или RetryAfter для повтора."""
+        count_error(error)
+        delay = retry_after(error)
+        if delay is None:
+            if self.logger:
+                self.logger.error(f'Ошибка отправки сообщения: {error}')
+            return False
+        self.limiter.pause(chat_id, delay)
+        if self.logger:
+            self.logger.warning(f'Telegram не принял сообщение в чат '
+                                f'{chat_id} (код {error_status(error)}), '
+                                f'повтор через {delay} с.')
+        raise RetryAfter(delay) from error
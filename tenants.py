@@ -0,0 +1,145 @@
+import logging
+import time
+
+from dedupe import DedupeCache, error_fingerprint, homework_fingerprint
+from metrics import check_seconds, count_error, timed
+from validator import order_records, validate_answer
+
+
+logger = logging.getLogger('homework')
+
+
+class Tenant:
+    """Студент: токен Практикума, чат Telegram и состояние опроса."""
+
+    __slots__ = ('token', 'chat_id', 'timestamp', 'last_message',
+                 'last_status', 'next_poll', 'dedupe')
+
+    def __init__(self, token, chat_id, timestamp=None):
+        """Создает студента с меткой времени последнего опроса."""
+        self.token = token
+        self.chat_id = chat_id
+        self.timestamp = (int(time.time()) if timestamp is None
+                          else timestamp)
+        self.last_message = ''
+        self.last_status = None
+        self.next_poll = 0
+        self.dedupe = None
+
+    def new_message(self, message, fingerprint=None):
+        """Возвращает сообщение, если его еще не отправляли в этот чат.
+
+        Без кэша повтором считается только совпадение с предыдущим
+        сообщением; с кэшем — и недавнее уведомление с тем же отпечатком.
+        """
+        if message == self.last_message:
+            return None
+        if (self.dedupe is not None and fingerprint is not None
+                and not self.dedupe.first_seen(self.chat_id, fingerprint)):
+            return None
+        self.last_message = message
+        return message
+
+    def __repr__(self):
+        """Возвращает представление без токена."""
+        return f'Tenant(chat_id={self.chat_id!r})'
+
+
+class TenantRegistry:
+    """Реестр студентов, опрашиваемых одним процессом.
+
+    Студенты реестра делят один кэш отправленных уведомлений.
+    """
+
+    def __init__(self, tenants=(), dedupe=None):
+        """Создает реестр из последовательности студентов."""
+        self.dedupe = DedupeCache() if dedupe is None else dedupe
+        self._tenants = {}
+        for tenant in tenants:
+            self.add(tenant)
+
+    @classmethod
+    def from_file(cls, path):
+        """Загружает пары «токен чат» из файла, по одной на строку."""
+        registry = cls()
+        with open(path, encoding='utf-8') as file:
+            for number, line in enumerate(file, start=1):
+                line = line.split('#', 1)[0].replace(',', ' ').strip()
+                if not line:
+                    continue
+                fields = line.split()
+                if len(fields) != 2:
+                    raise ValueError(f'Строка {number} файла {path}: '
+                                     'ожидается пара «токен чат».')
+                registry.add(Tenant(*fields))
+        return registry
+
+    def add(self, tenant):
+        """Добавляет студента, заменяя запись с тем же токеном."""
+        tenant.dedupe = self.dedupe
+        self._tenants[tenant.token] = tenant
+
+    def get(self, token):
+        """Возвращает студента по токену или None."""
+        return self._tenants.get(token)
+
+    def __iter__(self):
+        """Перебирает студентов в порядке добавления."""
+        return iter(list(self._tenants.values()))
+
+    def __len__(self):
+        """Возвращает число студентов."""
+        return len(self._tenants)
+
+
+def process_answer(tenant, api_answer, store=None):
+    """Проверяет ответ API и возвращает новые сообщения для студента.
+
+    Ошибочные работы пропускаются с записью в лог, не мешая остальным.
+    """
+    answer = timed(check_seconds, validate_answer, api_answer)
+    for error in answer.errors:
+        logger.error(f'Ошибка в ответе API для {tenant!r}: '
+                     f'{error.path}: {error.message}', extra={
+                         'tenant': tenant.chat_id, 'phase': 'validate'})
+    homeworks = order_records(answer.homeworks)
+    tenant.timestamp = answer.current_date
+    if homeworks:
+        tenant.last_status = homeworks[-1].status
+        if store:
+            homeworks = store.new_homeworks(tenant.token, homeworks)
+    else:
+        logger.debug('Новые статусы отсутствуют.', extra={
+            'tenant': tenant.chat_id, 'phase': 'idle'})
+    messages = []
+    for homework in homeworks:
+        message = homework.message
+        if tenant.new_message(message, homework_fingerprint(homework)):
+            logger.debug(f'Новый статус работы: {homework.status}', extra={
+                'tenant': tenant.chat_id, 'homework_id': homework.id,
+                'phase': 'notify'})
+            messages.append(message)
+    if store:
+        store.save_tenant(tenant)
+    return messages
+
+
+def process_error(tenant, error, store=None):
+    """Логирует ошибку опроса и возвращает сообщения о ней."""
+    count_error(error)
+    message = f'Ошибка работы программы: {error}'
+    logger.error(message, extra={'tenant': tenant.chat_id, 'phase': 'poll'})
+    if not tenant.new_message(message, error_fingerprint(error)):
+        return []
+    if store:
+        store.save_tenant(tenant)
+    return [message]
+
+
+def poll_tenant(client, tenant, store=None):
+    """Опрашивает API для студента и возвращает новые сообщения."""
+    try:
+        api_answer = client.get_api_answer(tenant.token, tenant.timestamp)
+        return process_answer(tenant, api_answer, store)
+    except Exception as error:
+        return process_error(tenant, error, store)
@@ -0,0 +1,46 @@
+import json
+import threading
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        from_date = int(query.get('from_date', ['0'])[0])
+        self.server.calls.append(
+            (from_date, self.headers.get('Authorization')))
+        status, data = self.server.responder(from_date)
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def empty_answer(from_date):
+    return HTTPStatus.OK, {'homeworks': [], 'current_date': from_date + 1}
+
+
+@contextmanager
+def fake_api(responder=empty_answer):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeAPIHandler)
+    server.daemon_threads = True
+    server.responder = responder
+    server.calls = []
+    thread = threading.Thread(target=server.serve_forever,
+                              args=(0.05,), daemon=True)
+    thread.start()
+    try:
+        yield server, f'http://127.0.0.1:{server.server_port}/'
+    finally:
+        server.shutdown()
+        server.server_close()
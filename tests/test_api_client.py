@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+import time
+
+import pytest
+
+from api_client import PracticumClient
+from breaker import CLOSED, CircuitBreaker
+from exceptions import IncorrectStatusRequest
+from hedging import HedgedCaller
+from ratelimit import GLOBAL_BURST, RateLimiter
+from tests.fake_api import fake_api
+
+
+def test_client_reuses_connection_between_polls():
+    with fake_api() as (server, url), PracticumClient(endpoint=url) as client:
+        for timestamp in range(5):
+            answer = client.get_api_answer('token', timestamp)
+            assert answer['current_date'] == timestamp + 1
+        stats = client.stats()
+    assert stats.requests == 5
+    assert stats.handshakes == 1
+    assert stats.reused == 4
+    assert server.calls[0] == (0, 'OAuth token')
+
+
+def test_client_caches_headers_per_token():
+    client = PracticumClient()
+    assert client.headers('a') is client.headers('a')
+    assert client.headers('b') == {'Authorization': 'OAuth b'}
+
+
+def test_client_raises_on_not_ok_status():
+    def responder(from_date):
+        return HTTPStatus.BAD_GATEWAY, {}
+
+    with fake_api(responder) as (_, url), PracticumClient(url) as client:
+        with pytest.raises(IncorrectStatusRequest):
+            client.get_api_answer('token', 0)
+
+
+class InstantClient(PracticumClient):
+    def _request(self, token, timestamp, timeout):
+        time.sleep(0.005)
+        return {'homeworks': [], 'current_date': timestamp + 1}
+
+
+def test_burst_of_tenants_waits_at_limiter_before_deadline_starts():
+    tenants = GLOBAL_BURST + 40
+    limiter = RateLimiter(global_rate=200, global_burst=GLOBAL_BURST)
+    hedger = HedgedCaller(deadline=0.1, hedge_after=0.05)
+    client = InstantClient(limiter=limiter, breaker=CircuitBreaker(),
+                           hedger=hedger)
+    with client, ThreadPoolExecutor(max_workers=tenants) as pool:
+        answers = list(pool.map(
+            lambda token: client.get_api_answer(token, 0),
+            (str(number) for number in range(tenants))))
+    assert all(answer['current_date'] == 1 for answer in answers)
+    assert limiter.stats().max_wait > hedger.deadline
+    stats = hedger.stats()
+    assert (stats.timeouts, stats.hedged) == (0, 0)
+    assert client.breaker.state == CLOSED
+    assert max(hedger.latencies.samples) < hedger.hedge_after
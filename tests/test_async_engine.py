@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+from telebot import asyncio_helper
+
+from async_engine import (AsyncPracticumClient, AsyncTelegramSender,
+                          consume_outbox, poll_once, send_outbox)
+from ratelimit import RateLimiter
+from state_store import StateStore
+from tenants import Tenant, TenantRegistry
+
+TENANTS = 2000
+RESPONSE_DELAY = 0.05
+
+
+class AsyncStubBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+async def run_fake_endpoint_round(registry, concurrency):
+    state = {'in_flight': 0, 'peak': 0}
+
+    async def homework_statuses(request):
+        state['in_flight'] += 1
+        state['peak'] = max(state['peak'], state['in_flight'])
+        await asyncio.sleep(RESPONSE_DELAY)
+        state['in_flight'] -= 1
+        token = request.headers['Authorization'].split()[-1]
+        homeworks = []
+        if int(token) % 10 == 0:
+            homeworks.append({'homework_name': f'hw{token}.zip',
+                              'status': 'reviewing'})
+        from_date = int(request.query['from_date'])
+        return web.json_response(
+            {'homeworks': homeworks, 'current_date': from_date + 1})
+
+    app = web.Application()
+    app.router.add_get('/', homework_statuses)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    bot = AsyncStubBot()
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            client = AsyncPracticumClient(session, f'http://127.0.0.1:{port}/')
+            started = time.monotonic()
+            await poll_once(client, bot, registry)
+            elapsed = time.monotonic() - started
+    finally:
+        await runner.cleanup()
+    return bot, state['peak'], elapsed
+
+
+@pytest.mark.timeout(30)
+def test_async_engine_polls_thousands_of_tenants_concurrently():
+    registry = TenantRegistry(
+        Tenant(str(number), f'chat{number}', timestamp=0)
+        for number in range(TENANTS)
+    )
+    bot, peak, elapsed = asyncio.run(
+        run_fake_endpoint_round(registry, concurrency=500))
+    assert all(tenant.timestamp == 1 for tenant in registry)
+    assert len(bot.sent) == TENANTS // 10
+    assert 1 < peak <= 500
+    assert elapsed < TENANTS * RESPONSE_DELAY / 10
+
+
+class FlakyAsyncBot:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.sent = []
+
+    async def send_message(self, chat_id, text):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append((chat_id, text))
+
+
+def test_send_outbox_requeues_rate_limited_and_keeps_failed_entries(
+        tmp_path):
+    store = StateStore(tmp_path / 'state.db')
+    store.enqueue('101', 'first')
+    store.enqueue('102', 'second')
+    store.flush()
+    too_many = asyncio_helper.ApiTelegramException('sendMessage', None, {
+        'ok': False, 'error_code': 429, 'description': 'Too Many Requests',
+        'parameters': {'retry_after': 0.05}})
+    bot = FlakyAsyncBot([too_many, aiohttp.ClientConnectionError('down')])
+    send = AsyncTelegramSender(bot, limiter=RateLimiter(
+        global_rate=1000, global_burst=1000, token_rate=1000, token_burst=1))
+    asyncio.run(send_outbox(send, store))
+    assert bot.sent == [('101', 'first')]
+    assert [entry.text for entry in store.take_outbox()] == ['second']
+    store.close()
+
+
+class ThrottledAsyncBot:
+    def __init__(self, throttled_chat, retry_after):
+        self.throttled_chat = throttled_chat
+        self.retry_after = retry_after
+        self.sent = []
+
+    async def send_message(self, chat_id, text):
+        if chat_id == self.throttled_chat and not self.sent:
+            raise asyncio_helper.ApiTelegramException(
+                'sendMessage', None, {
+                    'ok': False, 'error_code': 429,
+                    'description': 'Too Many Requests',
+                    'parameters': {'retry_after': self.retry_after}})
+        self.sent.append((chat_id, text))
+
+
+def test_throttled_chat_does_not_hold_back_other_outbox_entries(tmp_path):
+    store = StateStore(tmp_path / 'state.db')
+    bot = ThrottledAsyncBot('101', retry_after=0.5)
+    send = AsyncTelegramSender(bot, limiter=RateLimiter(
+        global_rate=1000, global_burst=1000, token_rate=1000, token_burst=1))
+
+    async def deliver():
+        entries = asyncio.Queue()
+        consumer = asyncio.create_task(consume_outbox(send, store, entries))
+        store.enqueue('101', 'first')
+        store.enqueue('102', 'second')
+        store.flush()
+        for entry in store.take_outbox():
+            entries.put_nowait(entry)
+        await asyncio.sleep(0.1)
+        sent_early = list(bot.sent)
+        await asyncio.sleep(0.6)
+        consumer.cancel()
+        return sent_early
+
+    assert asyncio.run(deliver()) == [('102', 'second')]
+    assert bot.sent == [('102', 'second'), ('101', 'first')]
+    store.close()
@@ -0,0 +1,70 @@
+from backfill import HomeworkStream, backfill, chunked
+from state_store import StateStore
+from tenants import Tenant
+
+
+def history(statuses):
+    return {'homeworks': [{'id': number, 'homework_name': f'hw{number}.zip',
+                           'status': status}
+                          for number, status in enumerate(statuses)],
+            'current_date': 777}
+
+
+def test_chunked_splits_into_bounded_lists():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_backfill_onboarding_stores_history_silently(tmp_path):
+    store = StateStore(tmp_path / 'state.db')
+    tenant = Tenant('tok', '101', timestamp=0)
+    progress = []
+    stream = HomeworkStream(history(['approved'] * 5))
+    messages = list(backfill(stream, store, tenant, chunk_size=2,
+                             on_progress=progress.append))
+    assert messages == []
+    assert [item.homeworks for item in progress] == [2, 4, 5]
+    assert store.status('tok', '4') == 'approved'
+    assert store.load('tok') == (777, '')
+    store.close()
+
+
+def test_backfill_recovery_reports_only_transitions(tmp_path):
+    store = StateStore(tmp_path / 'state.db')
+    tenant = Tenant('tok', '101', timestamp=0)
+    list(backfill(HomeworkStream(history(['reviewing', 'approved'])),
+                  store, tenant))
+    stream = HomeworkStream(history(['approved', 'approved', 'reviewing']))
+    messages = list(backfill(stream, store, tenant, announce_new=True))
+    assert len(messages) == 2
+    assert '"hw0.zip"' in messages[0] and '"hw2.zip"' in messages[1]
+    store.close()
+
+
+def test_backfill_skips_broken_homeworks(tmp_path):
+    store = StateStore(tmp_path / 'state.db')
+    tenant = Tenant('tok', '101', timestamp=0)
+    answer = history(['approved', 'unknown', 'reviewing'])
+    messages = list(backfill(HomeworkStream(answer), store, tenant,
+                             announce_new=True))
+    assert len(messages) == 2
+    assert store.status('tok', '1') is None
+    store.close()
+
+
+def test_backfill_commits_statuses_after_messages_are_enqueued(tmp_path):
+    path = tmp_path / 'state.db'
+    store = StateStore(path)
+    tenant = Tenant('tok', '101', timestamp=0)
+    stream = HomeworkStream(history(['approved', 'reviewing']))
+    messages = backfill(stream, store, tenant, announce_new=True,
+                        chunk_size=1)
+    first = next(messages)
+    store.enqueue(tenant.chat_id, first)
+    next(messages)
+    store.connection.close()
+
+    store = StateStore(path)
+    assert store.status('tok', '0') == 'approved'
+    assert store.status('tok', '1') is None
+    assert [entry.text for entry in store.take_outbox()] == [first]
+    store.close()
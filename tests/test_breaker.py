@@ -0,0 +1,59 @@
+import pytest
+
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from exceptions import (CircuitBreakerOpen, IncorrectAPIRequest,
+                        IncorrectStatusRequest)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def failing():
+    raise IncorrectAPIRequest('down')
+
+
+def test_breaker_opens_after_threshold_and_short_circuits():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30,
+                             clock=FakeClock())
+    for _ in range(2):
+        with pytest.raises(IncorrectAPIRequest):
+            breaker.call(failing)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitBreakerOpen):
+        breaker.call(lambda: 'not called')
+    stats = breaker.stats()
+    assert (stats.opened, stats.short_circuited) == (1, 1)
+
+
+def test_breaker_probes_once_in_half_open_state():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30,
+                             clock=clock)
+    with pytest.raises(IncorrectAPIRequest):
+        breaker.call(failing)
+    clock.now = 31
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitBreakerOpen):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now = 62
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CLOSED
+
+
+def test_breaker_ignores_client_errors():
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    def unauthorized():
+        raise IncorrectStatusRequest('Статус запроса не 200', 401)
+
+    with pytest.raises(IncorrectStatusRequest):
+        breaker.call(unauthorized)
+    assert breaker.state == CLOSED
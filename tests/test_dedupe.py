@@ -0,0 +1,54 @@
+from dedupe import DedupeCache, error_fingerprint, homework_fingerprint
+from exceptions import IncorrectAPIRequest
+from tenants import Tenant, TenantRegistry, process_error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_dedupes_per_chat_until_ttl():
+    clock = FakeClock()
+    cache = DedupeCache(capacity=10, ttl=60, clock=clock)
+    assert cache.first_seen('101', ('homework', '1', 'approved'))
+    assert not cache.first_seen('101', ('homework', '1', 'approved'))
+    assert cache.first_seen('102', ('homework', '1', 'approved'))
+    clock.now = 61
+    assert cache.first_seen('101', ('homework', '1', 'approved'))
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 3)
+    assert stats.expirations == 2
+
+
+def test_cache_evicts_least_recently_used_over_capacity():
+    cache = DedupeCache(capacity=2, ttl=60, clock=FakeClock())
+    cache.first_seen('101', 'a')
+    cache.first_seen('101', 'b')
+    cache.first_seen('101', 'a')
+    cache.first_seen('101', 'c')
+    assert len(cache) == 2
+    assert cache.stats().evictions == 1
+    assert not cache.first_seen('101', 'a')
+    assert cache.first_seen('101', 'b')
+
+
+def test_fingerprints():
+    homework = {'id': 7, 'homework_name': 'hw.zip', 'status': 'approved',
+                'date_updated': '2021-04-11T10:31:09Z'}
+    assert homework_fingerprint(homework) == (
+        'homework', '7', 'approved', '2021-04-11T10:31:09Z')
+    assert error_fingerprint(IncorrectAPIRequest('x')) == (
+        'error', 'IncorrectAPIRequest')
+
+
+def test_alternating_errors_are_not_resent():
+    registry = TenantRegistry([Tenant('tok', '101')])
+    tenant = registry.get('tok')
+    assert process_error(tenant, IncorrectAPIRequest('down'))
+    assert process_error(tenant, ValueError('bad json'))
+    assert process_error(tenant, IncorrectAPIRequest('down again')) == []
+    assert registry.dedupe.stats().hits == 1
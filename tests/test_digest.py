@@ -0,0 +1,35 @@
+from digest import MESSAGE_LIMIT, build_digests, collapse
+
+
+STATUS = 'Изменился статус проверки работы "hw{}.zip". Работа проверена.'
+
+
+def test_single_message_is_sent_as_is():
+    assert build_digests(['one']) == ['one']
+
+
+def test_messages_are_merged_under_header():
+    texts = [STATUS.format(number) for number in range(3)]
+    (digest,) = build_digests(texts)
+    assert digest.startswith('Обновлений: 3')
+    assert all(text in digest for text in texts)
+
+
+def test_repeated_errors_are_collapsed():
+    assert collapse(['down', 'bad', 'down', 'down']) == ['down (×3)', 'bad']
+
+
+def test_long_digests_are_split_at_telegram_limit():
+    texts = [STATUS.format(number) * 10 for number in range(40)]
+    digests = build_digests(texts)
+    assert len(digests) > 1
+    assert all(len(digest) <= MESSAGE_LIMIT for digest in digests)
+    assert digests[0].startswith(f'Обновлений: 40 (часть 1 из {len(digests)})')
+    joined = ''.join(digests)
+    assert all(text in joined for text in texts)
+
+
+def test_oversized_single_message_is_split():
+    digests = build_digests(['x' * (MESSAGE_LIMIT * 2)])
+    assert len(digests) == 3
+    assert all(len(digest) <= MESSAGE_LIMIT for digest in digests)
@@ -0,0 +1,67 @@
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from exceptions import IncorrectAPIRequest
+from hedging import HedgedCaller
+
+
+def slow_then_fast(delays):
+    calls = itertools.count()
+
+    def call():
+        number = next(calls)
+        time.sleep(delays[number])
+        return number
+
+    return call
+
+
+def test_hedged_caller_fires_second_request_after_threshold():
+    hedger = HedgedCaller(deadline=2, hedge_after=0.05)
+    started = time.monotonic()
+    assert hedger.call(slow_then_fast([0.5, 0.01])) == 1
+    assert time.monotonic() - started < 0.3
+    stats = hedger.stats()
+    assert (stats.calls, stats.hedged, stats.hedge_wins) == (1, 1, 1)
+    hedger.shutdown()
+
+
+def test_hedged_caller_does_not_hedge_fast_requests():
+    hedger = HedgedCaller(deadline=2, hedge_after=0.2)
+    assert hedger.call(slow_then_fast([0.01, 0.01])) == 0
+    assert hedger.stats().hedged == 0
+    hedger.shutdown()
+
+
+def test_hedged_caller_enforces_poll_deadline():
+    hedger = HedgedCaller(deadline=0.1, hedge=False)
+    with pytest.raises(IncorrectAPIRequest):
+        hedger.call(time.sleep, 0.5)
+    assert hedger.stats().timeouts == 1
+    hedger.shutdown()
+
+
+def test_hedged_caller_async_first_response_wins():
+    hedger = HedgedCaller(deadline=2, hedge_after=0.05)
+    delays = iter([0.5, 0.01])
+
+    async def call():
+        delay = next(delays)
+        await asyncio.sleep(delay)
+        return delay
+
+    assert asyncio.run(hedger.call_async(call)) == 0.01
+    assert hedger.stats().hedge_wins == 1
+    hedger.shutdown()
+
+
+def test_hedged_caller_skips_hedge_without_free_token():
+    hedger = HedgedCaller(deadline=2, hedge_after=0.05)
+    assert hedger.call(slow_then_fast([0.2, 0.01]),
+                       may_hedge=lambda: False) == 0
+    stats = hedger.stats()
+    assert (stats.hedged, stats.hedge_wins) == (0, 0)
+    hedger.shutdown()
@@ -0,0 +1,54 @@
+import pytest
+import telebot
+
+import homework
+
+
+class StopPolling(Exception):
+    pass
+
+
+def run_one_poll(monkeypatch, answer):
+    sent = []
+
+    class Bot:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def send_message(self, chat_id, text):
+            sent.append(text)
+
+    def stop(seconds):
+        raise StopPolling
+
+    monkeypatch.setattr(homework, 'PRACTICUM_TOKEN', 'sometoken')
+    monkeypatch.setattr(homework, 'TELEGRAM_TOKEN', '1234:abcdefg')
+    monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '12345')
+    monkeypatch.setattr(telebot, 'TeleBot', Bot)
+    monkeypatch.setattr(homework, 'get_api_answer', lambda timestamp: answer)
+    monkeypatch.setattr(homework.time, 'sleep', stop)
+    with pytest.raises(StopPolling):
+        homework.main()
+    return sent
+
+
+def test_broken_homework_does_not_drop_the_rest(monkeypatch):
+    answer = {'homeworks': [
+        {'id': 1, 'homework_name': 'hw1.zip', 'status': 'weird',
+         'date_updated': '2021-04-10T10:00:00Z'},
+        {'id': 2, 'homework_name': 'hw2.zip', 'status': 'approved',
+         'date_updated': '2021-04-11T10:00:00Z'},
+    ], 'current_date': 10}
+    sent = run_one_poll(monkeypatch, answer)
+    assert len(sent) == 2
+    assert sent[0].startswith('Ошибка работы программы')
+    assert '"hw2.zip"' in sent[1]
+
+
+def test_logging_is_set_up_once_by_main(monkeypatch):
+    run_one_poll(monkeypatch, {'homeworks': [], 'current_date': 10})
+    log_handler = homework.log_handler
+    run_one_poll(monkeypatch, {'homeworks': [], 'current_date': 10})
+    assert log_handler is not None
+    assert homework.setup_logging() is log_handler
+    assert homework.logger.handlers == [log_handler]
@@ -0,0 +1,101 @@
+import json
+import logging
+import sys
+import time
+
+from log_format import JsonFormatter, RepeatSampler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def make_record(msg, level=logging.DEBUG, **extra):
+    record = logging.LogRecord('homework', level, __file__, 1, msg, None,
+                               None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_writes_fields_passed_in_extra():
+    record = make_record('Новые статусы отсутствуют.', tenant='42',
+                         phase='idle', duration=0.25)
+    document = json.loads(JsonFormatter().format(record))
+    assert document['message'] == 'Новые статусы отсутствуют.'
+    assert document['level'] == 'DEBUG'
+    assert document['logger'] == 'homework'
+    assert document['tenant'] == '42'
+    assert document['phase'] == 'idle'
+    assert document['duration'] == 0.25
+    assert 'homework_id' not in document
+    assert document['time'].endswith(f'.{int(record.msecs):03d}')
+
+
+def test_json_formatter_includes_exception_text():
+    try:
+        raise ValueError('сломано')
+    except ValueError:
+        record = logging.LogRecord('homework', logging.ERROR, __file__, 1,
+                                   'ошибка', None, sys.exc_info())
+    document = json.loads(JsonFormatter().format(record))
+    assert 'ValueError: сломано' in document['exc_info']
+
+
+class CaptureHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_sampler_folds_idle_polls_of_all_tenants_into_one_summary():
+    clock = FakeClock()
+    handler = CaptureHandler()
+    sampler = RepeatSampler(handler, window=60, clock=clock)
+    for second in range(0, 60, 10):
+        clock.now = second
+        for tenant in ('1', '2', '3'):
+            assert not sampler.filter(make_record(
+                'Новые статусы отсутствуют.', tenant=tenant, phase='idle'))
+    clock.now = 60
+    sampler.flush()
+    [summary] = handler.records
+    assert summary.getMessage() == (
+        'Новые статусы отсутствуют. (×18 за 60 с, студентов: 3)')
+    assert (summary.count, summary.tenants, summary.phase) == (18, 3, 'idle')
+    assert sampler.filter(summary)
+    assert sampler.suppressed == 18
+    sampler.flush()
+    assert len(handler.records) == 1
+
+
+def test_sampler_passes_other_records():
+    sampler = RepeatSampler(CaptureHandler(), window=60, clock=FakeClock())
+    for _ in range(3):
+        assert sampler.filter(make_record('Отправлено сообщение'))
+        assert sampler.filter(make_record('Ошибка', logging.ERROR,
+                                          tenant='1', phase='idle'))
+        assert sampler.filter(make_record('Новый статус', tenant='1',
+                                          phase='notify'))
+    assert sampler.suppressed == 0
+
+
+def test_sampler_is_disabled_with_zero_window():
+    sampler = RepeatSampler(CaptureHandler(), window=0, clock=FakeClock())
+    assert all(sampler.filter(make_record('idle', tenant='1', phase='idle'))
+               for _ in range(3))
+
+
+def test_sampler_emits_summaries_on_a_timer():
+    handler = CaptureHandler()
+    sampler = RepeatSampler(handler, window=0.05).start()
+    sampler.filter(make_record('idle', tenant='1', phase='idle'))
+    time.sleep(0.2)
+    assert [record.count for record in handler.records] == [1]
+    sampler.stop()
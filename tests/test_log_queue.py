@@ -0,0 +1,65 @@
+import logging
+import threading
+import time
+
+from log_queue import BoundedQueueHandler, start_log_listener, stop_listener
+
+
+class SlowHandler(logging.Handler):
+    def __init__(self, delay=0, gate=None):
+        super().__init__()
+        self.delay = delay
+        self.gate = gate
+        self.lines = []
+
+    def emit(self, record):
+        if self.gate:
+            self.gate.wait(5)
+        time.sleep(self.delay)
+        self.lines.append(self.format(record))
+
+
+def make_logger(name):
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+def test_slow_handler_does_not_delay_logging_calls():
+    logger = make_logger('test_log_queue.slow')
+    handler = SlowHandler(delay=0.05)
+    handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+    queue_handler = start_log_listener(logger, handler)
+    started = time.perf_counter()
+    for number in range(5):
+        logger.info('poll %s', number)
+    assert time.perf_counter() - started < 0.05
+    stop_listener(queue_handler.listener)
+    assert handler.lines == [f'INFO: poll {number}' for number in range(5)]
+
+
+def test_full_queue_drops_records_and_counts_them():
+    logger = make_logger('test_log_queue.full')
+    release = threading.Event()
+    handler = SlowHandler(gate=release)
+    queue_handler = start_log_listener(logger, handler, maxsize=2)
+    for number in range(10):
+        logger.debug('idle %s', number)
+    release.set()
+    stop_listener(queue_handler.listener)
+    dropped = queue_handler.dropped['DEBUG']
+    assert dropped >= 7
+    assert len(handler.lines) == 10 - dropped
+
+
+def test_restart_replaces_previous_queue_handler():
+    logger = make_logger('test_log_queue.restart')
+    handler = SlowHandler()
+    first = start_log_listener(logger, handler)
+    second = start_log_listener(logger, handler)
+    assert [type(item) for item in logger.handlers] == [BoundedQueueHandler]
+    assert logger.handlers == [second] and first.listener._thread is None
+    logger.warning('once')
+    stop_listener(second.listener)
+    assert handler.lines == ['once']
@@ -0,0 +1,87 @@
+import gzip
+import logging
+import os
+import time
+
+from log_rotation import CompressingRotatingFileHandler, LogCompressor
+
+
+def write_lines(handler, count, prefix='строка'):
+    for number in range(count):
+        handler.emit(logging.makeLogRecord(
+            {'msg': f'{prefix} {number} ' + 'x' * 80, 'levelno': logging.INFO,
+             'levelname': 'INFO'}))
+
+
+def test_rollover_compresses_segments_in_background(tmp_path):
+    path = tmp_path / 'bot.log'
+    handler = CompressingRotatingFileHandler(path, max_bytes=2000)
+    write_lines(handler, 100)
+    handler.compressor.join()
+    handler.close()
+    archives = handler.compressor.archives()
+    assert archives
+    assert not handler.compressor.pending_segments()
+    lines = []
+    for archive in archives:
+        with gzip.open(archive, 'rt') as source:
+            lines.extend(source.read().splitlines())
+    lines.extend(path.read_text().splitlines())
+    assert [line.split()[1] for line in lines] == [
+        str(number) for number in range(100)]
+    stats = handler.compressor.stats()
+    assert stats.segments == len(archives)
+    assert stats.bytes_saved > 0
+    assert stats.compressed_bytes < stats.original_bytes
+
+
+def test_leftover_segments_are_compressed_on_start(tmp_path):
+    path = tmp_path / 'bot.log'
+    (tmp_path / 'bot.log.1').write_text('старый сегмент\n' * 50)
+    handler = CompressingRotatingFileHandler(path)
+    handler.compressor.join()
+    handler.close()
+    assert not (tmp_path / 'bot.log.1').exists()
+    with gzip.open(tmp_path / 'bot.log.1.gz', 'rt') as source:
+        assert source.read() == 'старый сегмент\n' * 50
+
+
+def make_archive(path, size, age=0):
+    path.write_bytes(os.urandom(size))
+    modified = time.time() - age
+    os.utime(path, (modified, modified))
+
+
+def test_retention_removes_oldest_archives_over_size(tmp_path):
+    base = tmp_path / 'bot.log'
+    for number in range(3):
+        make_archive(tmp_path / f'bot.log.{number}.gz', 1000,
+                     age=100 - number)
+    compressor = LogCompressor(str(base), max_bytes=2500, max_age=3600)
+    (tmp_path / 'bot.log.3').write_bytes(os.urandom(1000))
+    compressor.submit(str(tmp_path / 'bot.log.3'))
+    compressor.join()
+    remaining = [os.path.basename(path) for path in compressor.archives()]
+    assert remaining == ['bot.log.2.gz', 'bot.log.3.gz']
+    assert compressor.stats().removed == 2
+
+
+def test_compression_failures_are_counted_and_reported(tmp_path, capsys):
+    compressor = LogCompressor(str(tmp_path / 'bot.log'))
+    compressor.submit(str(tmp_path / 'bot.log.missing'))
+    compressor.join()
+    assert compressor.stats().failures == 1
+    assert compressor.stats().segments == 0
+    assert 'bot.log.missing' in capsys.readouterr().err
+
+
+def test_retention_removes_archives_older_than_max_age(tmp_path):
+    base = tmp_path / 'bot.log'
+    make_archive(tmp_path / 'bot.log.old.gz', 10, age=7200)
+    make_archive(tmp_path / 'bot.log.new.gz', 10, age=10)
+    compressor = LogCompressor(str(base), max_age=3600)
+    (tmp_path / 'bot.log.last').write_text('запись\n')
+    compressor.submit(str(tmp_path / 'bot.log.last'))
+    compressor.join()
+    remaining = [os.path.basename(path) for path in compressor.archives()]
+    assert remaining == ['bot.log.new.gz', 'bot.log.last.gz']
@@ -0,0 +1,125 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from api_client import build_client
+from breaker import OPEN
+from metrics import (Histogram, MetricsRegistry, bind_stats, errors_total,
+                     registry, send_seconds, start_metrics_server, timed)
+from outbound import OutboundQueue
+from ratelimit import RateLimiterStats
+
+
+def test_counter_and_gauge_are_rendered_with_labels():
+    registry = MetricsRegistry()
+    errors = registry.counter('errors_total', 'Ошибки.',
+                              labels=('exception',))
+    errors.labels('KeyError').inc()
+    errors.labels('KeyError').inc(2)
+    errors.labels('Bad"Name').inc()
+    depth = registry.gauge('queue_depth', 'Глубина очереди.')
+    depth.set_function(lambda: 7)
+    assert registry.render().splitlines() == [
+        '# HELP errors_total Ошибки.',
+        '# TYPE errors_total counter',
+        'errors_total{exception="KeyError"} 3',
+        'errors_total{exception="Bad\\"Name"} 1',
+        '# HELP queue_depth Глубина очереди.',
+        '# TYPE queue_depth gauge',
+        'queue_depth 7',
+    ]
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram('poll_seconds', 'Опрос.',
+                                 labels=('stage',), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.labels('request').observe(value)
+    assert registry.render().splitlines()[2:] == [
+        'poll_seconds_bucket{stage="request",le="0.1"} 2',
+        'poll_seconds_bucket{stage="request",le="1"} 3',
+        'poll_seconds_bucket{stage="request",le="+Inf"} 4',
+        'poll_seconds_sum{stage="request"} 3.65',
+        'poll_seconds_count{stage="request"} 4',
+    ]
+
+
+def test_registering_same_name_returns_existing_metric():
+    registry = MetricsRegistry()
+    counter = registry.counter('sent_total', 'Отправлено.')
+    assert registry.counter('sent_total', 'Отправлено.') is counter
+    with pytest.raises(ValueError):
+        registry.gauge('sent_total', 'Отправлено.')
+    with pytest.raises(ValueError):
+        registry.counter('other_total', 'Другое.',
+                         labels=('chat',)).labels()
+
+
+def test_bind_stats_reads_numeric_fields_on_every_render():
+    metrics = MetricsRegistry()
+    limiter = metrics.gauge('limiter', 'Ограничитель.', labels=('field',))
+    stats = [RateLimiterStats(1, 0, 0.0, 0.0)]
+    bind_stats(limiter, lambda: stats[-1])
+    stats.append(RateLimiterStats(3, 1, 2.5, 2.5))
+    assert metrics.render().splitlines()[2:] == [
+        'limiter{field="acquired"} 3',
+        'limiter{field="delayed"} 1',
+        'limiter{field="total_wait"} 2.5',
+        'limiter{field="max_wait"} 2.5',
+    ]
+
+
+def test_client_and_outbound_stats_are_exported():
+    with build_client() as client, \
+            OutboundQueue(lambda chat_id, text: None, window=0) as outbound:
+        outbound.put(1, 'ok')
+        client.breaker.state = OPEN
+        lines = registry.render().splitlines()
+    assert 'homework_api_breaker_state{state="open"} 1' in lines
+    assert 'homework_api_breaker_state{state="closed"} 0' in lines
+    assert 'homework_api_limiter{field="total_wait"} 0' in lines
+    assert 'homework_outbound{field="enqueued"} 1' in lines
+
+
+def test_timed_observes_failed_calls():
+    histogram = Histogram(buckets=(1,))
+
+    def fail():
+        raise KeyError('homeworks')
+
+    with pytest.raises(KeyError):
+        timed(histogram, fail)
+    assert histogram.snapshot()[0][-1] == (float('inf'), 1)
+
+
+def test_server_serves_metrics_in_text_format():
+    registry = MetricsRegistry()
+    registry.counter('polls_total', 'Опросы.').inc()
+    server = start_metrics_server(0, metrics=registry)
+    url = f'http://127.0.0.1:{server.server_port}'
+    try:
+        with urllib.request.urlopen(f'{url}/metrics', timeout=1) as response:
+            assert response.headers['Content-Type'].startswith('text/plain')
+            assert 'polls_total 1' in response.read().decode().splitlines()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f'{url}/other', timeout=1)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_outbound_queue_records_send_latency_and_errors():
+    def send(chat_id, text):
+        if text == 'сбой':
+            raise ConnectionError('нет сети')
+
+    errors = errors_total.labels('ConnectionError')
+    before_errors = errors.value()
+    before_sends = send_seconds.snapshot()[0][-1][1]
+    with OutboundQueue(send, maxsize=10, workers=1, window=0) as outbound:
+        outbound.put(1, 'ok')
+        outbound.put(1, 'сбой')
+    assert errors.value() == before_errors + 1
+    assert send_seconds.snapshot()[0][-1][1] == before_sends + 2
@@ -0,0 +1,194 @@
+import threading
+
+import pytest
+
+import homework
+from outbound import DROP_NEWEST, DROP_OLDEST, OutboundQueue
+from state_store import OutboxEntry, StateStore
+
+
+class BlockedSender:
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.sent = []
+
+    def __call__(self, chat_id, text):
+        self.started.set()
+        self.release.wait(5)
+        self.sent.append((chat_id, text))
+
+
+def test_queue_sends_in_background_and_reports_metrics():
+    sent = []
+    with OutboundQueue(lambda chat_id, text: sent.append(text),
+                       workers=3) as outbound:
+        for number in range(50):
+            assert outbound.put('101', f'm{number}')
+        outbound.join()
+    assert sorted(sent) == sorted(f'm{number}' for number in range(50))
+    stats = outbound.stats()
+    assert (stats.enqueued, stats.sent, stats.dropped) == (50, 50, 0)
+    assert stats.depth == 0 and stats.max_depth >= 1
+
+
+def test_put_does_not_wait_for_slow_sender():
+    sender = BlockedSender()
+    outbound = OutboundQueue(sender, maxsize=10, workers=1).start()
+    assert outbound.put('101', 'first')
+    assert sender.started.wait(5)
+    assert outbound.put('101', 'second')
+    assert sender.sent == []
+    sender.release.set()
+    outbound.stop()
+    assert sender.sent == [('101', 'first'), ('101', 'second')]
+
+
+@pytest.mark.parametrize('overflow, expected', [
+    (DROP_NEWEST, ['busy', 'a', 'b']),
+    (DROP_OLDEST, ['busy', 'b', 'c']),
+])
+def test_overflow_policies(overflow, expected):
+    sender = BlockedSender()
+    outbound = OutboundQueue(sender, maxsize=2, workers=1,
+                             overflow=overflow).start()
+    outbound.put('101', 'busy')
+    assert sender.started.wait(5)
+    results = [outbound.put('101', text) for text in 'abc']
+    assert results == [True, True, overflow == DROP_OLDEST]
+    sender.release.set()
+    outbound.stop()
+    assert [text for _, text in sender.sent] == expected
+    assert outbound.stats().dropped == 1
+
+
+def test_block_policy_applies_backpressure_then_drops():
+    sender = BlockedSender()
+    outbound = OutboundQueue(sender, maxsize=1, workers=1,
+                             block_timeout=0.05).start()
+    outbound.put('101', 'busy')
+    assert sender.started.wait(5)
+    assert outbound.put('101', 'queued')
+    assert not outbound.put('101', 'dropped')
+    sender.release.set()
+    outbound.stop()
+    assert outbound.stats().dropped == 1
+
+
+def test_failed_sends_are_counted():
+    with OutboundQueue(lambda chat_id, text: False, workers=1) as outbound:
+        outbound.put('101', 'lost')
+    assert outbound.stats().failed == 1
+
+
+def test_send_message_enqueues_when_queue_is_installed(monkeypatch):
+    sent = []
+    outbound = OutboundQueue(lambda chat_id, text: sent.append(text),
+                             workers=1).start()
+    monkeypatch.setattr(homework, 'outbound', outbound)
+    homework.send_message(object(), 'queued')
+    outbound.stop()
+    assert sent == ['queued']
+
+
+def test_on_done_acknowledges_only_answered_messages():
+    done = []
+    failed = []
+
+    def send(chat_id, text):
+        if text == 'network':
+            raise ConnectionError('down')
+        return text != 'rejected'
+
+    with OutboundQueue(send, workers=1, on_done=done.append,
+                       on_failed=failed.append) as outbound:
+        for number, text in enumerate(['sent', 'rejected', 'network']):
+            outbound.put('101', text, entry_id=number)
+    assert done == [0, 1]
+    assert failed == [OutboxEntry(2, '101', 'network')]
+
+
+def test_failed_outbox_entry_is_redelivered_in_a_later_round(tmp_path):
+    store = StateStore(tmp_path / 'state.db')
+    sent = []
+    failures = [ConnectionError('down')]
+
+    def send(chat_id, text):
+        if failures:
+            raise failures.pop()
+        sent.append((chat_id, text))
+
+    store.enqueue('101', 'new status')
+    with OutboundQueue(send, workers=1, on_done=store.acknowledge,
+                       on_failed=store.return_entry) as outbound:
+        for _ in range(2):
+            store.flush()
+            outbound.put_entries(store.take_outbox())
+            outbound.join()
+    store.flush()
+    assert sent == [('101', 'new status')]
+    assert store.connection.execute(
+        'SELECT COUNT(*) FROM outbox').fetchone() == (0,)
+    store.close()
+
+
+def test_dropped_outbox_entries_are_returned():
+    failed = []
+    outbound = OutboundQueue(lambda chat_id, text: None, maxsize=1,
+                             overflow=DROP_NEWEST, on_failed=failed.append)
+    assert outbound.put('101', 'queued', entry_id=1)
+    assert not outbound.put('101', 'dropped', entry_id=2)
+    assert failed == [OutboxEntry(2, '101', 'dropped')]
+
+
+def test_window_coalesces_messages_per_chat_into_digests():
+    sent = []
+    done = []
+    with OutboundQueue(lambda chat_id, text: sent.append((chat_id, text)),
+                       workers=1, window=0.05,
+                       on_done=done.append) as outbound:
+        for number in range(3):
+            outbound.put('101', f'status {number}', entry_id=number)
+        outbound.put('102', 'other', entry_id=3)
+    assert sorted(chat_id for chat_id, _ in sent) == ['101', '102']
+    digest = dict(sent)['101']
+    assert digest.startswith('Обновлений: 3')
+    assert dict(sent)['102'] == 'other'
+    assert sorted(done) == [0, 1, 2, 3]
+    assert outbound.stats().coalesced == 2
+
+
+@pytest.mark.parametrize('overflow, expected', [
+    (DROP_NEWEST, [True, True, False]),
+    (DROP_OLDEST, [True, True, True]),
+])
+def test_window_applies_overflow_policy_to_collected_messages(overflow,
+                                                              expected):
+    sent = []
+    outbound = OutboundQueue(lambda chat_id, text: sent.append(text),
+                             maxsize=2, workers=1, overflow=overflow,
+                             window=0.05)
+    assert [outbound.put('101', f'status {number}')
+            for number in range(3)] == expected
+    outbound.start().stop()
+    assert outbound.stats().dropped == 1
+    [digest] = sent
+    assert digest.startswith('Обновлений: 2')
+    assert ('status 0' in digest) == (overflow == DROP_NEWEST)
+
+
+def test_window_block_policy_waits_for_room_then_drops():
+    outbound = OutboundQueue(lambda chat_id, text: None, maxsize=1,
+                             workers=1, block_timeout=0.05, window=10)
+    assert outbound.put('101', 'collected')
+    assert not outbound.put('102', 'dropped')
+    assert outbound.stats().dropped == 1
+
+
+def test_window_block_policy_resumes_after_digest_is_sent():
+    sent = []
+    with OutboundQueue(lambda chat_id, text: sent.append(text), maxsize=1,
+                       workers=1, block_timeout=1, window=0.05) as outbound:
+        assert outbound.put('101', 'first')
+        assert outbound.put('101', 'second')
+    assert sent == ['first', 'second']
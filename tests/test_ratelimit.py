@@ -0,0 +1,65 @@
+import pytest
+
+from ratelimit import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allows_burst_then_spaces_requests():
+    bucket = TokenBucket(rate=2, capacity=2, now=0)
+    assert bucket.reserve(0) == 0
+    assert bucket.reserve(0) == 0
+    assert bucket.reserve(0) == pytest.approx(0.5)
+    assert bucket.reserve(0) == pytest.approx(1.0)
+    assert bucket.reserve(10) == 0
+
+
+def test_rate_limiter_applies_per_token_and_global_limits():
+    clock = FakeClock()
+    limiter = RateLimiter(global_rate=10, global_burst=3,
+                          token_rate=1, token_burst=1, clock=clock)
+    assert limiter.reserve('a') == 0
+    assert limiter.reserve('a') == pytest.approx(1.0)
+    assert limiter.reserve('b') == 0
+    assert limiter.reserve('c') == pytest.approx(0.1)
+    stats = limiter.stats()
+    assert stats.acquired == 4
+    assert stats.delayed == 2
+    assert stats.total_wait == pytest.approx(1.1)
+    assert stats.max_wait == pytest.approx(1.0)
+
+
+def test_rate_limiter_acquire_sleeps_for_reservation(monkeypatch):
+    slept = []
+    monkeypatch.setattr('ratelimit.time.sleep', slept.append)
+    limiter = RateLimiter(token_rate=4, token_burst=1, clock=FakeClock())
+    limiter.acquire('a')
+    limiter.acquire('a')
+    assert slept == [pytest.approx(0.25)]
+
+
+def test_wait_time_and_pause_do_not_reserve():
+    clock = FakeClock()
+    limiter = RateLimiter(global_rate=10, global_burst=10,
+                          token_rate=1, token_burst=1, clock=clock)
+    assert limiter.wait_time('chat') == 0
+    assert limiter.wait_time('chat') == 0
+    limiter.pause('chat', 5)
+    assert limiter.wait_time('chat') == pytest.approx(5)
+    clock.now = 5
+    assert limiter.reserve('chat') == 0
+
+
+def test_try_acquire_reserves_only_immediate_requests():
+    limiter = RateLimiter(global_rate=1, global_burst=2, token_rate=1,
+                          token_burst=2, clock=FakeClock())
+    assert limiter.try_acquire('a')
+    assert limiter.try_acquire('b')
+    assert not limiter.try_acquire('c')
+    assert limiter.stats().acquired == 2
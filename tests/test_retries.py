@@ -0,0 +1,91 @@
+import pytest
+import requests
+
+from exceptions import IncorrectAPIRequest, IncorrectStatusRequest
+from retries import (DEADLINE, EXHAUSTED, FATAL, NO_BUDGET, RETRY, SUCCESS,
+                     Retrier, RetryBudget, is_transient)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def flaky(errors, result='ok'):
+    errors = list(errors)
+
+    def call():
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return call
+
+
+def api_error(cause):
+    try:
+        raise IncorrectAPIRequest('fail') from cause
+    except IncorrectAPIRequest as error:
+        return error
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    slept = []
+    monkeypatch.setattr('retries.time.sleep', slept.append)
+    return slept
+
+
+def test_is_transient_classifies_errors():
+    assert is_transient(IncorrectStatusRequest('', 502))
+    assert is_transient(IncorrectStatusRequest('', 429))
+    assert not is_transient(IncorrectStatusRequest('', 401))
+    assert is_transient(api_error(requests.ConnectionError()))
+    assert not is_transient(api_error(requests.exceptions.InvalidURL()))
+    assert not is_transient(KeyError('homeworks'))
+
+
+def test_retrier_retries_transient_errors_with_capped_backoff(no_sleep):
+    retrier = Retrier(attempts=4, base_delay=1, max_delay=3)
+    call = flaky([IncorrectStatusRequest('', 502)] * 3)
+    assert retrier.call(call) == 'ok'
+    assert len(no_sleep) == 3
+    assert all(0 <= delay <= cap
+               for delay, cap in zip(no_sleep, (1, 2, 3)))
+    assert retrier.outcomes == {RETRY: 3, SUCCESS: 1}
+    assert [record.attempt for record in retrier.history] == [1, 2, 3, 4]
+
+
+def test_retrier_stops_on_fatal_and_exhausted(no_sleep):
+    retrier = Retrier(attempts=2)
+    with pytest.raises(IncorrectStatusRequest):
+        retrier.call(flaky([IncorrectStatusRequest('', 404)]))
+    with pytest.raises(IncorrectStatusRequest):
+        retrier.call(flaky([IncorrectStatusRequest('', 503)] * 2))
+    assert retrier.outcomes == {FATAL: 1, RETRY: 1, EXHAUSTED: 1}
+
+
+def test_retry_budget_limits_retries(no_sleep):
+    budget = RetryBudget(ratio=0.5, reserve_rate=0, capacity=1,
+                         clock=FakeClock())
+    retrier = Retrier(attempts=5, budget=budget)
+    with pytest.raises(IncorrectStatusRequest):
+        retrier.call(flaky([IncorrectStatusRequest('', 503)] * 5))
+    assert retrier.outcomes == {RETRY: 1, NO_BUDGET: 1}
+
+
+def test_retrier_stops_at_deadline(no_sleep):
+    clock = FakeClock()
+    retrier = Retrier(attempts=5, base_delay=0, deadline=10, clock=clock)
+
+    def slow_failure():
+        clock.now += 4
+        raise IncorrectAPIRequest('Нет ответа API за 4 с.')
+
+    with pytest.raises(IncorrectAPIRequest):
+        retrier.call(slow_failure)
+    assert clock.now == 12
+    assert retrier.outcomes == {RETRY: 2, DEADLINE: 1}
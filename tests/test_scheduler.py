@@ -0,0 +1,73 @@
+import random
+
+from homework import RETRY_PERIOD
+from scheduler import (IDLE_INTERVAL, STATUS_INTERVALS, AdaptivePolicy,
+                       DeadlineScheduler)
+from tenants import Tenant
+
+
+def test_policy_polls_reviewing_more_often_than_approved():
+    policy = AdaptivePolicy(jitter=0)
+    tenant = Tenant('tok', '101', timestamp=0)
+    tenant.last_status = 'reviewing'
+    reviewing = policy.decide(tenant, now=1000)
+    tenant.last_status = 'approved'
+    approved = policy.decide(tenant, now=1000)
+    assert reviewing.interval == STATUS_INTERVALS['reviewing']
+    assert approved.interval == STATUS_INTERVALS['approved']
+    assert reviewing.interval < RETRY_PERIOD < approved.interval
+    assert tenant.next_poll == approved.next_poll == 1000 + approved.interval
+
+
+def test_policy_jitter_stays_within_bounds():
+    policy = AdaptivePolicy(jitter=0.1, rng=random.Random(1))
+    intervals = {policy.interval('rejected') for _ in range(100)}
+    assert len(intervals) > 1
+    assert all(RETRY_PERIOD * 0.9 <= value <= RETRY_PERIOD * 1.1
+               for value in intervals)
+
+
+def test_policy_polls_idle_tenants_least_often():
+    policy = AdaptivePolicy(jitter=0)
+    assert policy.interval(None) == IDLE_INTERVAL
+    assert IDLE_INTERVAL > policy.interval('unknown') == RETRY_PERIOD
+
+
+def test_stagger_spreads_first_polls_across_one_interval():
+    policy = AdaptivePolicy(rng=random.Random(1))
+    tenants = [Tenant(str(number), str(number), timestamp=0)
+               for number in range(200)]
+    policy.stagger(tenants, now=1000)
+    deadlines = [tenant.next_poll for tenant in tenants]
+    assert all(1000 <= deadline < 1000 + RETRY_PERIOD
+               for deadline in deadlines)
+    assert min(deadlines) < 1000 + RETRY_PERIOD / 4
+    assert max(deadlines) > 1000 + RETRY_PERIOD * 3 / 4
+
+
+def make_tenant(token, next_poll):
+    tenant = Tenant(token, token, timestamp=0)
+    tenant.next_poll = next_poll
+    return tenant
+
+
+def test_deadline_scheduler_pops_due_tenants_in_order():
+    tenants = [make_tenant(str(deadline), deadline)
+               for deadline in (300, 100, 200)]
+    scheduler = DeadlineScheduler(tenants)
+    assert scheduler.seconds_until_next(now=40) == 60
+    due = scheduler.pop_due(now=250)
+    assert [tenant.next_poll for tenant in due] == [100, 200]
+    assert scheduler.pop_due(now=250) == []
+    assert scheduler.seconds_until_next(now=320) == 0
+
+
+def test_deadline_scheduler_skips_stale_entries_after_reschedule():
+    tenant = make_tenant('a', 100)
+    scheduler = DeadlineScheduler([tenant])
+    tenant.next_poll = 500
+    scheduler.push(tenant)
+    assert scheduler.pop_due(now=200) == []
+    assert scheduler.next_deadline() == 500
+    assert scheduler.pop_due(now=500) == [tenant]
+    assert scheduler.seconds_until_next(now=600) == RETRY_PERIOD
@@ -0,0 +1,129 @@
+from telebot.apihelper import ApiTelegramException
+
+from homework import send_outbox
+from state_store import StateStore
+from tenants import Tenant, process_answer
+
+
+def homework(homework_id, status):
+    return {'id': homework_id, 'homework_name': f'hw{homework_id}.zip',
+            'status': status, 'date_updated': '2021-04-11T10:31:09Z'}
+
+
+def test_store_uses_wal_and_survives_restart(tmp_path):
+    path = tmp_path / 'state.db'
+    store = StateStore(path)
+    mode = store.connection.execute('PRAGMA journal_mode').fetchone()[0]
+    assert mode == 'wal'
+    store.save('tok', 1234, 'last')
+    store.new_homeworks('tok', [homework(1, 'reviewing')])
+    store.close()
+
+    store = StateStore(path)
+    tenant = store.restore(Tenant('tok', '101', timestamp=0))
+    assert (tenant.timestamp, tenant.last_message) == (1234, 'last')
+    assert store.status('tok', '1') == 'reviewing'
+    assert store.load('other') is None
+    store.close()
+
+
+def test_store_filters_known_statuses(tmp_path):
+    store = StateStore(tmp_path / 'state.db')
+    first = [homework(1, 'reviewing'), homework(2, 'approved')]
+    assert store.new_homeworks('tok', first) == first
+    assert store.new_homeworks('tok', first) == []
+    changed = [homework(1, 'approved')]
+    assert store.new_homeworks('tok', changed + first[1:]) == changed
+    store.close()
+
+
+def test_store_commits_in_batches(tmp_path):
+    path = tmp_path / 'state.db'
+    store = StateStore(path, batch_size=3)
+    reader = StateStore(path)
+    store.save('a', 1, '')
+    store.save('b', 2, '')
+    store.maybe_flush()
+    assert reader.load('a') is None
+    store.save('c', 3, '')
+    assert reader.load('a') is None
+    store.maybe_flush()
+    assert reader.load('a') == (1, '')
+    store.close()
+    reader.close()
+
+
+def test_process_answer_does_not_resend_after_restart(tmp_path):
+    path = tmp_path / 'state.db'
+    answer = {'homeworks': [homework(1, 'approved')], 'current_date': 50}
+    store = StateStore(path)
+    assert len(process_answer(Tenant('tok', '101', 0), answer, store)) == 1
+    store.close()
+
+    store = StateStore(path)
+    tenant = store.restore(Tenant('tok', '101'))
+    assert tenant.timestamp == 50
+    tenant.last_message = ''
+    assert process_answer(tenant, answer, store) == []
+    store.close()
+
+
+def test_outbox_replays_unacknowledged_notifications(tmp_path):
+    path = tmp_path / 'state.db'
+    store = StateStore(path)
+    store.enqueue('101', 'first')
+    store.enqueue('102', 'second')
+    store.flush()
+    first, second = store.take_outbox()
+    store.acknowledge(first.id)
+    store.close()
+
+    store = StateStore(path)
+    assert list(store.take_outbox()) == [second]
+    store.acknowledge(second.id)
+    store.close()
+    assert list(StateStore(path).take_outbox()) == []
+
+
+def test_outbox_is_group_committed_with_statuses(tmp_path):
+    store = StateStore(tmp_path / 'state.db')
+    commits = []
+    store.connection.set_trace_callback(
+        lambda statement: statement == 'COMMIT' and commits.append(1))
+    for number in range(50):
+        store.new_homeworks('tok', [homework(number, 'approved')])
+        store.enqueue('101', f'status {number}')
+    store.flush()
+    assert len(commits) == 1
+    assert len(list(store.take_outbox())) == 50
+    store.close()
+
+
+def test_failed_send_keeps_notification_in_outbox(tmp_path):
+    class FailingBot:
+        def send_message(self, chat_id, text):
+            raise ApiTelegramException('sendMessage', None, {
+                'ok': False, 'error_code': 502, 'description': 'error'})
+
+    path = tmp_path / 'state.db'
+    store = StateStore(path)
+    store.enqueue('101', 'status')
+    store.flush()
+    send_outbox(FailingBot(), store)
+    store.close()
+    assert [entry.text for entry in StateStore(path).take_outbox()] == [
+        'status']
+
+
+def test_statuses_are_not_committed_before_their_notifications(tmp_path):
+    path = tmp_path / 'state.db'
+    answer = {'homeworks': [homework(1, 'approved')], 'current_date': 50}
+    store = StateStore(path, batch_size=1)
+    assert len(process_answer(Tenant('tok', '101', 0), answer, store)) == 1
+    store.connection.close()
+
+    store = StateStore(path)
+    assert store.status('tok', '1') is None
+    assert store.load('tok') is None
+    assert list(store.take_outbox()) == []
+    store.close()
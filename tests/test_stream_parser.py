@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from exceptions import IncorrectKeyCurrentDate
+from stream_parser import StreamingAnswer
+
+
+def chunks_of(text, size):
+    data = text.encode()
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+ANSWER = {
+    'homeworks': [
+        {'id': 1, 'homework_name': 'дз 1.zip', 'status': 'approved',
+         'reviewer_comment': 'Принято! [{"вложенные": "скобки"}]'},
+        {'id': 22, 'homework_name': 'hw2.zip', 'status': 'rejected'},
+    ],
+    'current_date': 1234567890,
+}
+
+
+@pytest.mark.parametrize('size', [1, 3, 7, 1024])
+def test_streaming_answer_yields_homeworks_across_chunk_borders(size):
+    stream = StreamingAnswer(chunks_of(json.dumps(ANSWER, indent=1), size))
+    assert list(stream) == ANSWER['homeworks']
+    assert stream.current_date == 1234567890
+
+
+def test_streaming_answer_closes_response():
+    closed = []
+    stream = StreamingAnswer([b'{"homeworks": [], "current_date": 1}'],
+                             close=lambda: closed.append(True))
+    assert list(stream) == []
+    assert closed == [True]
+
+
+@pytest.mark.parametrize('body, error', [
+    ('[]', TypeError),
+    ('{"current_date": 1}', KeyError),
+    ('{"homeworks": {}, "current_date": 1}', TypeError),
+    ('{"homeworks": [], "current_date": "1"}', IncorrectKeyCurrentDate),
+    ('{"homeworks": [{"id": 1}', ValueError),
+])
+def test_streaming_answer_validates_as_it_goes(body, error):
+    with pytest.raises(error):
+        list(StreamingAnswer(chunks_of(body, 4)))
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+from telebot.apihelper import ApiHTTPException, ApiTelegramException
+
+from exceptions import RetryAfter
+from outbound import OutboundQueue
+from ratelimit import RateLimiter
+from telegram_sender import SERVER_RETRY_AFTER, TelegramSender, retry_after
+
+
+def telegram_error(code, retry=None):
+    result_json = {'ok': False, 'error_code': code, 'description': 'error'}
+    if retry is not None:
+        result_json['parameters'] = {'retry_after': retry}
+    return ApiTelegramException('sendMessage', None, result_json)
+
+
+class FakeBot:
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id, text):
+        with self.lock:
+            if self.errors:
+                raise self.errors.pop(0)
+            self.sent.append((chat_id, text, time.monotonic()))
+
+
+def fast_limiter(chat_rate=1000):
+    return RateLimiter(global_rate=1000, global_burst=1000,
+                       token_rate=chat_rate, token_burst=1)
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.reason = 'Bad Gateway'
+        self.text = '<html>'
+
+
+def test_retry_after_requeues_only_429_and_server_errors():
+    assert retry_after(telegram_error(429, retry=3)) == 3
+    assert retry_after(telegram_error(502)) == SERVER_RETRY_AFTER
+    assert retry_after(ApiHTTPException(
+        'sendMessage', Response(502))) == SERVER_RETRY_AFTER
+    assert retry_after(telegram_error(400)) is None
+    assert retry_after(ApiHTTPException('sendMessage', Response(404))) is None
+    assert retry_after(ValueError()) is None
+
+
+def test_server_error_without_json_is_requeued():
+    sender = TelegramSender(
+        FakeBot([ApiHTTPException('sendMessage', Response(502))]),
+        limiter=fast_limiter())
+    with pytest.raises(RetryAfter) as error:
+        sender('101', 'text')
+    assert error.value.retry_after == SERVER_RETRY_AFTER
+
+
+def test_429_pauses_chat_and_asks_to_requeue():
+    sender = TelegramSender(FakeBot([telegram_error(429, retry=3)]),
+                            limiter=fast_limiter())
+    with pytest.raises(RetryAfter) as error:
+        sender('101', 'text')
+    assert error.value.retry_after == 3
+    with pytest.raises(RetryAfter):
+        sender('101', 'text')
+    assert sender('102', 'text') is True
+
+
+def test_other_api_errors_fail_the_message():
+    sender = TelegramSender(FakeBot([telegram_error(400)]),
+                            limiter=fast_limiter())
+    assert sender('101', 'text') is False
+
+
+def test_busy_chat_is_deferred_instead_of_blocking():
+    sender = TelegramSender(FakeBot(), limiter=fast_limiter(chat_rate=1))
+    assert sender('101', 'first')
+    with pytest.raises(RetryAfter) as error:
+        sender('101', 'second')
+    assert error.value.retry_after == pytest.approx(1, abs=0.1)
+    assert sender('102', 'other chat')
+
+
+def test_queue_requeues_rate_limited_messages_without_losing_them():
+    bot = FakeBot([telegram_error(429, retry=0.05)])
+    sender = TelegramSender(bot, limiter=fast_limiter(chat_rate=20))
+    with OutboundQueue(sender, workers=2) as outbound:
+        for number in range(3):
+            outbound.put('101', f'a{number}')
+        outbound.put('102', 'b0')
+    assert sorted(text for _, text, _ in bot.sent) == ['a0', 'a1', 'a2',
+                                                        'b0']
+    times = [sent for chat_id, _, sent in bot.sent if chat_id == '101']
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert min(gaps) >= 0.04
+    stats = outbound.stats()
+    assert (stats.sent, stats.failed, stats.dropped) == (4, 0, 0)
+    assert stats.deferred >= 1
@@ -0,0 +1,86 @@
+import pytest
+
+from exceptions import IncorrectAPIRequest
+from tenants import Tenant, TenantRegistry, poll_tenant
+
+
+class StubClient:
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.calls = []
+
+    def get_api_answer(self, token, timestamp):
+        self.calls.append((token, timestamp))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def homework(status, name='hw.zip', homework_id=1,
+             date_updated='2021-04-11T10:31:09Z'):
+    return {'id': homework_id, 'homework_name': name, 'status': status,
+            'date_updated': date_updated}
+
+
+def test_registry_from_file(tmp_path):
+    path = tmp_path / 'tenants.txt'
+    path.write_text('# token chat\ntok1 101\n\ntok2, 102  # second\n')
+    registry = TenantRegistry.from_file(path)
+    assert len(registry) == 2
+    assert [tenant.chat_id for tenant in registry] == ['101', '102']
+    assert registry.get('tok2').chat_id == '102'
+
+
+def test_registry_rejects_malformed_line(tmp_path):
+    path = tmp_path / 'tenants.txt'
+    path.write_text('tok1 101 extra\n')
+    with pytest.raises(ValueError):
+        TenantRegistry.from_file(path)
+
+
+def test_poll_tenant_advances_watermark_and_dedupes():
+    tenant = Tenant('tok', '101', timestamp=0)
+    answer = {'homeworks': [homework('approved')], 'current_date': 10}
+    client = StubClient([answer, dict(answer, current_date=20)])
+    [message] = poll_tenant(client, tenant)
+    assert 'ревьюеру всё понравилось' in message
+    assert poll_tenant(client, tenant) == []
+    assert client.calls == [('tok', 0), ('tok', 10)]
+    assert tenant.timestamp == 20
+
+
+def test_poll_tenant_reports_errors_once():
+    tenant = Tenant('tok', '101', timestamp=0)
+    error = IncorrectAPIRequest('down')
+    client = StubClient([error, error])
+    assert poll_tenant(client, tenant) == ['Ошибка работы программы: down']
+    assert poll_tenant(client, tenant) == []
+    assert tenant.timestamp == 0
+
+
+def test_poll_tenant_emits_every_transition_in_date_order():
+    tenant = Tenant('tok', '101', timestamp=0)
+    answer = {'homeworks': [
+        homework('approved', 'b.zip', 2, '2021-04-12T10:00:00Z'),
+        homework('rejected', 'a.zip', 1, '2021-04-11T10:00:00Z'),
+        homework('rejected', 'a.zip', 1, '2021-04-11T10:00:00Z'),
+    ], 'current_date': 10}
+    messages = poll_tenant(StubClient([answer]), tenant)
+    assert len(messages) == 2
+    assert '"a.zip"' in messages[0] and '"b.zip"' in messages[1]
+    assert tenant.last_status == 'approved'
+
+
+def test_poll_tenant_reports_resubmission_to_the_same_status():
+    registry = TenantRegistry([Tenant('tok', '101', timestamp=0)])
+    tenant = registry.get('tok')
+    client = StubClient([
+        {'homeworks': [homework(status, date_updated=date)],
+         'current_date': 10}
+        for status, date in (('reviewing', '2021-04-11T10:00:00Z'),
+                             ('rejected', '2021-04-11T12:00:00Z'),
+                             ('reviewing', '2021-04-11T15:00:00Z'),
+                             ('reviewing', '2021-04-11T15:00:00Z'))])
+    messages = [poll_tenant(client, tenant) for _ in range(4)]
+    assert [len(batch) for batch in messages] == [1, 1, 1, 0]
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from tenants import Tenant, TenantRegistry
+from thread_engine import ThreadPoller
+
+CALL_DELAY = 0.1
+
+
+class SlowStubClient:
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.lock = threading.Lock()
+        self.in_flight = self.peak = 0
+
+    def get_api_answer(self, token, timestamp, timeout=None):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delays.get(token, CALL_DELAY))
+        with self.lock:
+            self.in_flight -= 1
+        return {'homeworks': [{'homework_name': f'hw{token}.zip',
+                               'status': 'approved'}],
+                'current_date': timestamp + 1}
+
+
+def make_registry(size):
+    return TenantRegistry(
+        Tenant(str(number), f'chat{number}', timestamp=0)
+        for number in range(size))
+
+
+def test_thread_poller_fans_out_with_concurrency_limit():
+    client = SlowStubClient()
+    poller = ThreadPoller(client, max_workers=8)
+    registry = make_registry(16)
+    started = time.monotonic()
+    results = list(poller.poll(registry))
+    elapsed = time.monotonic() - started
+    poller.shutdown()
+    assert len(results) == 16
+    assert client.peak == 8
+    assert elapsed < 16 * CALL_DELAY / 2
+    assert all(tenant.timestamp == 1 for tenant in registry)
+
+
+def test_thread_poller_reports_tenants_past_deadline():
+    client = SlowStubClient(delays={'0': 1})
+    poller = ThreadPoller(client, max_workers=4, deadline=0.3)
+    registry = make_registry(3)
+    results = dict(
+        (tenant.token, message) for tenant, message in poller.poll(registry))
+    poller.shutdown()
+    assert results['0'].startswith('Ошибка работы программы: Нет ответа')
+    assert registry.get('0').timestamp == 0
+    assert 'ревьюеру всё понравилось' in results['1']
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from exceptions import IncorrectResponse
+from validator import (HomeworkRecord, as_records, order_records,
+                       validate_answer, validate_homework)
+
+
+def homework(status='approved', name='hw.zip', homework_id=1,
+             date_updated='2021-04-11T10:31:09Z'):
+    return {'id': homework_id, 'homework_name': name, 'status': status,
+            'date_updated': date_updated, 'lesson_name': 'Деплой'}
+
+
+def test_validate_answer_builds_records():
+    answer = validate_answer({'homeworks': [homework()], 'current_date': 10})
+    assert answer.current_date == 10
+    assert answer.errors == []
+    assert answer.homeworks == [
+        HomeworkRecord(1, 'hw.zip', 'approved', '2021-04-11T10:31:09Z')]
+    assert answer.homeworks[0].message.startswith(
+        'Изменился статус проверки работы "hw.zip".')
+
+
+def test_validate_answer_skips_only_broken_homeworks():
+    answer = validate_answer({'homeworks': [
+        homework(status='unknown'),
+        {'id': 2, 'status': 'rejected'},
+        homework(homework_id=3),
+        'not a dict',
+    ], 'current_date': 10})
+    assert [record.id for record in answer.homeworks] == [3]
+    assert [(error.path, error.code) for error in answer.errors] == [
+        ('homeworks[0].status', 'choice'),
+        ('homeworks[1].homework_name', 'missing'),
+        ('homeworks[3]', 'type'),
+    ]
+
+
+@pytest.mark.parametrize('response, paths', [
+    ([], ['$']),
+    ({}, ['homeworks', 'current_date']),
+    ({'homeworks': {}, 'current_date': '10'}, ['homeworks', 'current_date']),
+])
+def test_validate_answer_collects_all_document_errors(response, paths):
+    with pytest.raises(IncorrectResponse) as error:
+        validate_answer(response)
+    assert [item.path for item in error.value.errors] == paths
+
+
+def test_validate_homework_uses_exact_types_and_optional_fields():
+    errors = []
+    assert validate_homework({'homework_name': 'hw.zip',
+                              'status': 'approved'}, '', errors) == (
+        HomeworkRecord(None, 'hw.zip', 'approved', None))
+    assert validate_homework({'id': True, 'homework_name': 'hw.zip',
+                              'status': 'approved', 'date_updated': None},
+                             'doc', errors) is None
+    assert [(error.path, error.code) for error in errors] == [
+        ('doc.id', 'type')]
+
+
+def test_order_records_dedupes_and_sorts_by_date():
+    later = HomeworkRecord(1, 'hw.zip', 'approved', '2021-05-01T00:00:00Z')
+    earlier = HomeworkRecord(2, 'hw2.zip', 'reviewing', '2021-04-01T00:00:00Z')
+    assert order_records([later, earlier, later]) == [earlier, later]
+
+
+def test_statuses_are_interned_at_parse_time():
+    raw = json.loads(json.dumps([homework(homework_id=1),
+                                 homework(homework_id=2)]))
+    assert raw[0]['status'] is not raw[1]['status']
+    records = list(as_records(raw, []))
+    assert records[0].status is records[1].status
+
+
+def test_as_records_passes_records_and_reports_broken_items():
+    record = HomeworkRecord(1, 'hw.zip', 'approved', None)
+    errors = []
+    assert list(as_records([record, {'id': 2}], errors)) == [record]
+    assert [error.path for error in errors] == [
+        'homeworks[1].homework_name', 'homeworks[1].status']
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+import os
+
+import telebot
+
+from api_client import build_client
+from exceptions import IncorrectAPIRequest
+from homework import TELEGRAM_TOKEN, logger
+from outbound import OutboundQueue
+from scheduler import AdaptivePolicy, DeadlineScheduler
+from telegram_sender import TelegramSender
+from tenants import process_answer, process_error
+
+
+MAX_WORKERS = 32
+CALL_TIMEOUT = 10
+ROUND_DEADLINE = float(os.getenv('ROUND_DEADLINE', 60))
+
+
+class ThreadPoller:
+    """Раздает запросы к API по студентам в пул потоков.
+
+    Запросы выполняются в рабочих потоках, а ответы проверяются
+    и состояние студентов меняется только в вызывающем потоке,
+    по мере завершения запросов. deadline ограничивает весь круг опроса
+    реестра, а не опрос одного студента (его держит POLL_DEADLINE
+    из hedging): студенты, не опрошенные за deadline, получают ошибку.
+    """
+
+    def __init__(self, client, max_workers=MAX_WORKERS,
+                 call_timeout=CALL_TIMEOUT, deadline=ROUND_DEADLINE,
+                 policy=None, store=None):
+        """Создает пул потоков с ограничением одновременных запросов."""
+        self.client = client
+        self.store = store
+        self.policy = policy or AdaptivePolicy()
+        self.call_timeout = call_timeout
+        self.deadline = deadline
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='poller')
+
+    def poll(self, registry):
+        """Опрашивает реестр и выдает пары (студент, новое сообщение)."""
+        futures = {
+            self.executor.submit(self.client.get_api_answer, tenant.token,
+                                 tenant.timestamp, self.call_timeout): tenant
+            for tenant in registry
+        }
+        try:
+            for future in as_completed(futures, timeout=self.deadline):
+                tenant = futures.pop(future)
+                try:
+                    messages = process_answer(tenant, future.result(),
+                                              self.store)
+                except Exception as error:
+                    messages = process_error(tenant, error, self.store)
+                self.policy.decide(tenant)
+                for message in messages:
+                    yield tenant, message
+        except TimeoutError:
+            for future, tenant in futures.items():
+                future.cancel()
+                messages = process_error(tenant, IncorrectAPIRequest(
+                    f'Нет ответа API за {self.deadline} с.'), self.store)
+                self.policy.decide(tenant)
+                for message in messages:
+                    yield tenant, message
+
+    def shutdown(self):
+        """Останавливает пул, не дожидаясь зависших запросов."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_threads(registry, store, max_workers=MAX_WORKERS):
+    """Опрашивает в пуле потоков студентов, которым подошел срок."""
+    bot = telebot.TeleBot(token=TELEGRAM_TOKEN)
+    send = TelegramSender(bot, logger=logger)
+    with build_client(pool_maxsize=max_workers) as client, \
+            OutboundQueue(send, on_done=store.acknowledge,
+                          on_failed=store.return_entry,
+                          logger=logger) as outbound:
+        poller = ThreadPoller(client, max_workers, store=store)
+        poller.policy.stagger(registry)
+        scheduler = DeadlineScheduler(registry)
+        try:
+            while True:
+                due = scheduler.pop_due()
+                for tenant, message in poller.poll(due):
+                    store.enqueue(tenant.chat_id, message)
+                scheduler.push_all(due)
+                store.flush()
+                outbound.put_entries(store.take_outbox())
+                scheduler.sleep_until_next()
+        finally:
+            poller.shutdown()
@@ -0,0 +1,154 @@
+from collections import namedtuple
+import sys
+
+from constants import HOMEWORK_VERDICTS, STATUS_MESSAGE
+from exceptions import IncorrectResponse
+
+
+ValidationError = namedtuple('ValidationError', ('path', 'code', 'message'))
+ValidatedAnswer = namedtuple(
+    'ValidatedAnswer', ('homeworks', 'current_date', 'errors'))
+
+
+class HomeworkRecord(namedtuple(
+        'HomeworkRecord', ('id', 'homework_name', 'status', 'date_updated'))):
+    """Проверенная работа из ответа API.
+
+    Хранит только используемые поля, без словаря атрибутов экземпляра.
+    """
+
+    __slots__ = ()
+
+    @property
+    def key(self):
+        """Возвращает идентификатор работы для хранения ее статуса."""
+        return str(self.homework_name if self.id is None else self.id)
+
+    @property
+    def message(self):
+        """Возвращает сообщение об изменении статуса работы."""
+        return STATUS_MESSAGE.format(self.homework_name,
+                                     HOMEWORK_VERDICTS[self.status])
+
+
+STATUSES = {status: sys.intern(status) for status in HOMEWORK_VERDICTS}
+
+
+def format_path(path, name=None):
+    """Собирает путь к полю; путь элемента списка — пара (список, номер).
+
+    Строка пути нужна только для ошибок, поэтому в проверке элементов
+    передается пара и форматируется лишь при ошибке.
+    """
+    if type(path) is tuple:
+        path = f'{format_path(path[0])}[{path[1]}]'
+    if name is None:
+        return path or '$'
+    return f'{path}.{name}' if path else name
+
+
+def type_error(document, path, name, expected):
+    """Описывает отсутствующее поле или поле неверного типа."""
+    if name not in document:
+        return ValidationError(format_path(path, name), 'missing',
+                               'отсутствует обязательное поле')
+    return ValidationError(
+        format_path(path, name), 'type',
+        f'ожидался {expected.__name__}, '
+        f'получен {type(document[name]).__name__}')
+
+
+def document_error(document, path):
+    """Описывает документ, который оказался не словарем."""
+    return ValidationError(format_path(path), 'type',
+                           f'ожидался dict, получен {type(document).__name__}')
+
+
+def validate_homework(homework, path, errors):
+    """Проверяет работу за один проход и возвращает HomeworkRecord.
+
+    Типы сравниваются точно (True не сойдет за id), статус заменяется
+    его единственным экземпляром из STATUSES, так что тысячи записей
+    делят одну строку статуса вместо своей копии из JSON. При ошибке
+    причины дописываются в errors и возвращается None.
+    """
+    if type(homework) is not dict:
+        errors.append(document_error(homework, path))
+        return None
+    ok = True
+    homework_id = homework.get('id')
+    if type(homework_id) is not int and homework_id is not None:
+        ok = False
+        errors.append(type_error(homework, path, 'id', int))
+    name = homework.get('homework_name')
+    if type(name) is not str:
+        ok = False
+        errors.append(type_error(homework, path, 'homework_name', str))
+    status = homework.get('status')
+    if type(status) is not str:
+        ok = False
+        errors.append(type_error(homework, path, 'status', str))
+    else:
+        status = STATUSES.get(status, status)
+        if status not in STATUSES:
+            ok = False
+            errors.append(ValidationError(
+                format_path(path, 'status'), 'choice',
+                f'недопустимое значение {status!r}'))
+    date_updated = homework.get('date_updated')
+    if type(date_updated) is not str and date_updated is not None:
+        ok = False
+        errors.append(type_error(homework, path, 'date_updated', str))
+    if ok:
+        return tuple.__new__(HomeworkRecord,
+                             (homework_id, name, status, date_updated))
+    return None
+
+
+def validate_answer(response):
+    """Проверяет ответ API целиком и возвращает проверенные работы.
+
+    Ошибки уровня ответа выбрасываются как IncorrectResponse, ошибочные
+    работы пропускаются и возвращаются в errors вместе с причинами.
+    """
+    errors = []
+    if type(response) is not dict:
+        raise IncorrectResponse([document_error(response, '')])
+    homeworks = response.get('homeworks')
+    if type(homeworks) is not list:
+        errors.append(type_error(response, '', 'homeworks', list))
+    current_date = response.get('current_date')
+    if type(current_date) is not int:
+        errors.append(type_error(response, '', 'current_date', int))
+    if errors:
+        raise IncorrectResponse(errors)
+    records = []
+    for index, homework in enumerate(homeworks):
+        record = validate_homework(homework, ('homeworks', index), errors)
+        if record is not None:
+            records.append(record)
+    return tuple.__new__(ValidatedAnswer, (records, current_date, errors))
+
+
+def as_records(homeworks, errors):
+    """Преобразует работы из ответа в записи, пропуская ошибочные.
+
+    Готовые записи проходят без изменений; причины пропуска дописываются
+    в errors.
+    """
+    for index, homework in enumerate(homeworks):
+        if type(homework) is HomeworkRecord:
+            yield homework
+            continue
+        record = validate_homework(homework, ('homeworks', index), errors)
+        if record is not None:
+            yield record
+
+
+def order_records(records):
+    """Убирает повторы по id и статусу и сортирует работы по дате."""
+    unique = {}
+    for record in records:
+        unique.setdefault((record.key, record.status), record)
+    return sorted(unique.values(),
+                  key=lambda record: record.date_updated or '')